@@ -1,17 +1,50 @@
+# standard libraries
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import mmap
+import os
+
+
+
 # global variables
 CURSOR = '!!CURSOR!!'
+CACHE_DIR = '.lr_cache'
+CACHE_VERSION = 4   # bump whenever the layout of the cache files or the tables they hold change
+MODES = ('SLR', 'LALR')
+ASSOCIATIVITY = ('%left', '%right', '%nonassoc')   # the left sides of precedence declarations in a CFG
+ERROR = 0       # DenseTable action for an empty cell
+ACCEPT = -1     # DenseTable action for ACC
+PACKED_MAGIC = 0x4B50524C   # b'LRPK' when written little endian. also catches files written with the other byte order
+PACKED_VERSION = 2
+COMB_TRIES = 100    # how many offsets PackedTable.comb() tries for a row before putting it at the end
+WORKER_GRAMMAR = None   # the Grammar of a FiniteAutomata.generate_FA_parallel() worker process
 
 
 
 class Grammar:
     def __init__(self, CFG: [[str, [str]]]):
-        self.CFG = CFG
+        self.CFG, self.declarations = split_declarations(CFG)
         self.nonterminals = self.get_nonterminals()
         self.terminals = self.get_terminals()
-        self.FIRST = self.blank_table()
-        self.FOLLOW = self.blank_table()
+        self.start = self.CFG[0][0]
+        self.symbols = self.nonterminals + self.terminals + ['START']
+        self.symbol_ids = {name: index for index, name in enumerate(self.symbols)}
+        self.rules = self.get_rules()
+        self.productions = self.get_productions()
+        self.precedence = self.get_precedence()
+        self.rule_precedence = self.get_rule_precedence()
+        self.closures = self.get_closures()
+        self.nullable = [False] * len(self.nonterminals)
+        self.first_bits = [0] * len(self.nonterminals)
+        self.follow_bits = [0] * len(self.nonterminals)
+        self.populate_nullable()
         self.populate_first()
         self.populate_follow()
+        self.FIRST = self.blank_table(self.first_bits)
+        self.FOLLOW = self.blank_table(self.follow_bits)
 
 
 
@@ -31,147 +64,346 @@ class Grammar:
         Returns:
             [str]: each element is a different terminal
         '''
-        t = []
+        nonterminals = set(self.nonterminals)
+        t = dict()
         for rule in self.CFG:
             for right_side in rule[1]:
-                if right_side not in self.nonterminals and right_side not in t:
-                    t.append(right_side)
-        return t + ['$']
+                if right_side not in nonterminals:
+                    t[right_side] = None
+        return list(t) + ['$']
+
 
 
+    def get_rules(self) -> [(int, (int,))]:
+        '''Interns every production of the CFG as symbol ids
 
-    def blank_table(self):
-        '''Generates a blank FIRST or FOLLOW table
+        Rule 0 is the added START --> <prog> production, so every other rule's index is also its CFG rule # (used by Rx cells)
 
         Returns:
-            {str: list}: keys are nonterminals
+            [(int, (int,))]: each element is a (left side, right side) pair of symbol ids
         '''
-        table = dict()
-        for name in self.nonterminals:
-            table[name] = list()
-        return table
+        ids = self.symbol_ids
+        rules = [(ids['START'], (ids[self.start],))]
+        for rule in self.CFG:
+            rules.append((ids[rule[0]], tuple(ids[x] for x in rule[1])))
+        return rules
+
+
+
+    def get_productions(self) -> [[int]]:
+        '''Groups the rule #s by their left side
+
+        Returns:
+            [[int]]: indexed by nonterminal id, each element lists the rule #s that nonterminal produces
+        '''
+        productions = [[] for _ in self.nonterminals]
+        for index, (left, right) in enumerate(self.rules[1:], 1):
+            productions[left].append(index)
+        return productions
+
+
+
+    def get_precedence(self) -> {str: (int, str)}:
+        '''Reads the precedence declarations of the CFG
+
+        Like in yacc, each declaration is a level of precedence and later declarations have a higher precedence than earlier ones.
+            ["%left", ["+", "-"]]
+            ["%left", ["*", "/"]]
+        means * and / bind tighter than + and -, and a - b - c is (a - b) - c
+
+        Returns:
+            {str: (int, str)}: keys are terminals, values are their (precedence level, associativity)
+        '''
+        precedence = dict()
+        for level, (associativity, terminals) in enumerate(self.declarations, 1):
+            for terminal in terminals:
+                precedence[terminal] = (level, associativity)
+        return precedence
+
+
+
+    def get_rule_precedence(self) -> [int]:
+        '''Finds the precedence level of each rule #, which is the level of the last terminal on its right side that has one
+
+        Returns:
+            [int]: indexed by rule #. 0 if the rule has no precedence
+        '''
+        levels = list()
+        for _, right in self.rules:
+            level = 0
+            for symbol in right:
+                level = self.precedence.get(self.symbols[symbol], (level,))[0]
+            levels.append(level)
+        return levels
+
+
+
+    def resolve(self, rule: int, terminal: str) -> str:
+        '''Settles a shift/reduce conflict between reducing by a rule # and shifting a terminal with the precedence declarations
+
+        The higher precedence wins. If both are the same level, %left reduces, %right shifts and %nonassoc makes the cell an error.
+
+        Args:
+            rule (int)
+            terminal (str)
+
+        Returns:
+            str: 'S' to shift, 'R' to reduce or 'E' for an error. None if the rule or the terminal doesn't have a precedence
+        '''
+        level, associativity = self.precedence.get(terminal, (0, None))
+        if not level or not self.rule_precedence[rule]:
+            return None
+        if self.rule_precedence[rule] != level:
+            return 'R' if self.rule_precedence[rule] > level else 'S'
+        return {'%left': 'R', '%right': 'S'}.get(associativity, 'E')
+
+
+
+    def get_closures(self) -> [((int, int),)]:
+        '''Finds the lines that a CURSOR right before each nonterminal generates
+
+        CURSOR <expr> generates every production of <expr> with the CURSOR at the start, which in turn generates every production of <term>
+        and so on. These are the same in every node, so they're found once here instead of in every node that needs them.
+
+        Returns:
+            [((int, int),)]: indexed by nonterminal id, each element is the items generated by a CURSOR right before that nonterminal
+        '''
+        closures = list()
+        for nonterminal in range(len(self.nonterminals)):
+            items = list()
+            visited = [nonterminal]
+            seen = {nonterminal}
+            for symbol in visited: # visited grows while it's iterated over
+                for rule in self.productions[symbol]:
+                    items.append((rule, 0))
+                    right = self.rules[rule][1]
+                    if right and self.is_nonterminal(right[0]) and right[0] not in seen:
+                        seen.add(right[0])
+                        visited.append(right[0])
+            closures.append(tuple(items))
+        return closures
+
+
+
+    def rule_metadata(self) -> [[str, int]]:
+        '''Gets what the parser needs to know about each rule # to reduce by it
+
+        Returns:
+            [[str, int]]: the left side and the length of the right side of each rule #. rule 0 is START --> <prog>
+        '''
+        return [[self.symbols[left], len(right)] for left, right in self.rules]
+
+
+
+    def is_nonterminal(self, symbol: int) -> bool:
+        return symbol < len(self.nonterminals)
+
+
+
+    def propagate(self, bits: [int], edges: [[int]], worklist: [int]):
+        '''Pushes bits along edges until nothing changes anymore
+
+        Args:
+            bits ([int]): the bitset of each nonterminal. edited in place
+            edges ([[int]]): edges[X] lists every nonterminal whose bitset must contain bits[X]
+            worklist ([int]): the nonterminals whose bitsets still have to be pushed along their edges
+        '''
+        while worklist:
+            source = worklist.pop()
+            for target in edges[source]:
+                merged = bits[target] | bits[source]
+                if merged != bits[target]:
+                    bits[target] = merged
+                    worklist.append(target)
+
+
+
+    def populate_nullable(self):
+        '''Finds every nonterminal that can produce an empty string
+
+        Each rule keeps a count of the symbols on its right side that aren't known to be nullable yet.
+        When that count reaches 0, the left side is nullable.
+        '''
+        remaining = list()
+        waiting = [[] for _ in self.nonterminals] # waiting[X] lists the rules whose right side contains X
+        worklist = list()
+        for index, (left, right) in enumerate(self.rules[1:]):
+            remaining.append(len(right))
+            for symbol in right:
+                if not self.is_nonterminal(symbol):
+                    remaining[index] = -1 # a terminal can never be empty
+                    break
+            else:
+                for symbol in right:
+                    waiting[symbol].append(index)
+            if remaining[index] == 0 and not self.nullable[left]:
+                self.nullable[left] = True
+                worklist.append(left)
+
+        while worklist:
+            symbol = worklist.pop()
+            for index in waiting[symbol]:
+                remaining[index] -= 1
+                left = self.rules[index+1][0]
+                if remaining[index] == 0 and not self.nullable[left]:
+                    self.nullable[left] = True
+                    worklist.append(left)
 
 
 
     def populate_first(self):
-        for line in self.CFG:
-            self.first_of(line[0], [line])
+        '''Computes the FIRST set of every nonterminal at once
+
+        The terminals that can start a rule are added directly. A nonterminal that can start a rule
+        becomes an edge, since its FIRST set is part of the left side's FIRST set.
+        '''
+        edges = [[] for _ in self.nonterminals]
+        for left, right in self.rules[1:]:
+            for symbol in right:
+                if not self.is_nonterminal(symbol):
+                    self.first_bits[left] |= 1 << symbol
+                    break
+                if symbol != left:
+                    edges[symbol].append(left)
+                if not self.nullable[symbol]:
+                    break
+        self.propagate(self.first_bits, edges, list(range(len(self.nonterminals))))
 
 
 
-    def first_of(self, key, lines):
-        '''A recursive function to get one nonterminal's FIRST set
+    def first_of(self, symbols: (int,)) -> (int, bool):
+        '''Gets the FIRST set of a string of symbols
 
         Args:
-            key (str): the nonterminal's FIRST set to add to
-            lines ([[str, [str]]]): a list of each CFG line to iterate through
-        '''
-        for rule in lines:
-            left = rule[0]
-            right = rule[1][0]
-            if right in self.terminals and right not in self.FIRST[key]: # add FIRST(terminal)
-                self.FIRST[key].append(right)
-            elif right in self.nonterminals: # add FIRST(nonterminal) which requires recursion
-                if left == right: # don't get caught in an infinite loop
-                    continue
-                self.first_of(key, [x for x in self.CFG if x[0] == right]) # recursion
+            symbols ((int,)): symbol ids
+
+        Returns:
+            (int, bool): the FIRST set as a bitset, and whether the whole string can be empty
+        '''
+        bits = 0
+        for symbol in symbols:
+            if not self.is_nonterminal(symbol):
+                return bits | 1 << symbol, False
+            bits |= self.first_bits[symbol]
+            if not self.nullable[symbol]:
+                return bits, False
+        return bits, True
 
 
 
     def populate_follow(self):
-        for key in self.FOLLOW:
-            self.FOLLOW[key] = self.follow_of(key)
+        '''Computes the FOLLOW set of every nonterminal at once
+
+        For every nonterminal X in a rule A --> α X β, FIRST(β) is added directly to FOLLOW(X).
+        If β can be empty, then FOLLOW(A) is part of FOLLOW(X), which becomes an edge.
+        '''
+        edges = [[] for _ in self.nonterminals]
+        self.follow_bits[self.symbol_ids[self.start]] |= 1 << self.symbol_ids['$']
+        for left, right in self.rules[1:]:
+            after = 0               # FIRST of everything after the current symbol
+            after_nullable = True   # whether everything after the current symbol can be empty
+            for symbol in reversed(right):
+                if not self.is_nonterminal(symbol):
+                    after, after_nullable = 1 << symbol, False
+                    continue
+                self.follow_bits[symbol] |= after
+                if after_nullable and symbol != left:
+                    edges[left].append(symbol)
+                if self.nullable[symbol]:
+                    after |= self.first_bits[symbol]
+                else:
+                    after, after_nullable = self.first_bits[symbol], False
+        self.propagate(self.follow_bits, edges, list(range(len(self.nonterminals))))
 
 
 
-    def follow_of(self, key) -> [str]:
-        '''A recursive function to get one nonterminal's FOLLOW set
+    def terminal_names(self, bits: int) -> [str]:
+        '''Converts a bitset into the names of the terminals inside of it
 
         Args:
-            key (str): the nonterminal's FOLLOW set to add to
+            bits (int)
 
         Returns:
-            [str]: each element is a different terminal in the FOLLOW set
+            [str]
         '''
-        value = []
-        if key == '<prog>': # special case
-            value.append('$')
+        return [name for name in self.terminals if bits >> self.symbol_ids[name] & 1]
 
-        for rule in [x for x in self.CFG if key in x[1]]:
-            if rule[1][-1] == key:  # implying FOLLOW(nonterminal) is in FOLLOW(key) which requires recursion
-                if rule[0] == key:
-                    continue
-                value += [x for x in self.follow_of(rule[0]) if x not in value] # recursion
-                continue
 
-            after = rule[1][rule[1].index(key)+1] # implying FIRST(terminal) is in FOLLOW(key). no recursion necessary
-            if after in self.terminals:
-                if after not in value:
-                    value.append(after)
-                continue
 
-            value += [x for x in self.FIRST[after] if x not in value] # implying FIRST(nonterminal) is in FOLLOW(key). no recursion necessary
-        return value
+    def blank_table(self, bits: [int]) -> {str: [str]}:
+        '''Generates a FIRST or FOLLOW table from the bitset of each nonterminal
+
+        Args:
+            bits ([int]): indexed by nonterminal id
+
+        Returns:
+            {str: [str]}: keys are nonterminals
+        '''
+        table = dict()
+        for index, name in enumerate(self.nonterminals):
+            table[name] = self.terminal_names(bits[index])
+        return table
 
 
 
 
 
 class Node:
-    def __init__(self, CFG: Grammar, head: [[str, [str]]]):
+    __slots__ = ('CFG', 'id', 'kernel', 'body', 'paths', 'complete')
+
+    def __init__(self, CFG: Grammar, kernel: ((int, int),), expand: bool = True):
         '''FA Nodes
 
+        Every line of a node is an item: a (rule #, cursor position) pair, so [<expr> --> <expr> CURSOR + <term>] is (17, 1)
+
         Note:
-            self.body may not be accurate. the body is only used to generate the next nodes in the FA,
-            but aren't needed to generate the LR Parsing Table, so the accuracy of the body doesn't matter
-            after the FA is generated and as such, there is no effort being made to preserve the body.
+            self.body is only used to generate the next nodes in the FA and isn't needed to generate the LR Parsing Table,
+            so FiniteAutomata drops it as soon as the node's paths are taken.
+
+        Attributes:
+            kernel (((int, int),)): the sorted items the node was created from. this doubles as the node's canonical key
+            body ([(int, int)]): the kernel plus every item generated from it
+            paths ({int: int}): keys are the symbol ids of the paths, values are the state #s they lead to
+            complete ([int]): the rule #s of every item whose cursor is at the end of the line
+
+        Args:
+            expand (bool): whether to generate the body. FiniteAutomata skips this for nodes whose body it already knows
         '''
         self.CFG = CFG
-        self.head = head
+        self.id = None
+        self.kernel = kernel
         self.body = list()
         self.paths = dict()
-        for ele in head:
-            self.body.append([ele[0], [x for x in ele[1]]]) # this essentially deep copies the ele. without this, editing the body also edits the head
-            self.generate_body(ele)
-
-
-
-    def generate_body(self, next_: [str, [str]]):
-        '''Recursively generates productions based on the head
-
-        Attributes:
-            next_ ([str, [str]]): the production line with which to attempt to create more productions
-        '''
-        cur = next_[1].index(CURSOR)
-
-        if cur == len(next_[1])-1: # if the cursor is at the end of the line, ignore it (this only happens if it's part of the head)
+        self.complete = list()
+        if not expand:
             return
-
-        after_cur = next_[1][cur+1]
-        if after_cur[0] == '<':
-            # determine if there are any more productions to create. ie. if the element after the cursor starts with '<'
-            # ex:   CURSOR <indentifier> creates more productions
-            #       CURSOR "value=" does not create any more productions
-            new_productions = [[x[0], [CURSOR] + x[1]] for x in self.CFG.CFG if x[0] == after_cur] # find all the new productions that are made. ex: <identifier> has 3 separate productions
-            for prod in new_productions:
-                if prod in self.body: # make sure not to create duplicates
-                    continue
-                self.body.append(prod)
-                self.generate_body(prod) # recursion
-
+        body = dict() # used as an ordered set
+        for item in kernel:
+            body[item] = None
+            rule, cur = item
+            right = CFG.rules[rule][1]
+            if cur < len(right) and CFG.is_nonterminal(right[cur]):
+                # a CURSOR right before a nonterminal generates more productions
+                # ex:   CURSOR <indentifier> creates more productions
+                #       CURSOR "value=" does not create any more productions
+                body.update(dict.fromkeys(CFG.closures[right[cur]]))
+        self.body = list(body)
+        self.complete = [rule for rule, cur in self.body if cur == len(CFG.rules[rule][1])]
 
 
-    def __eq__(self, compare) -> bool:
-        '''For all intents and purposes, a Node object is really defined by its head.
 
-        This allows us to compare heads ([[str, [str]]]) with Node objects to determine equivalency.
+    def successors(self) -> {int: ((int, int),)}:
+        '''Moves the cursor forward in each line of the body, grouping the lines by the path (the symbol after the cursor) they take
 
         Returns:
-            bool: True if they are equal, False if otherwise
+            {int: ((int, int),)}: keys are the symbol ids of the paths, values are the sorted kernels of the nodes they lead to
         '''
-        if self.head == compare:
-            return True
-        return False
+        kernels = dict()
+        for rule, cur in self.body:
+            right = self.CFG.rules[rule][1]
+            if cur < len(right): # the cursor is at the end of the line, so there's no path to take
+                kernels.setdefault(right[cur], []).append((rule, cur+1))
+        return {path: tuple(sorted(kernel)) for path, kernel in kernels.items()}
 
 
 
@@ -179,8 +411,11 @@ class Node:
         '''Just for printing during debugging
         '''
         printme = ''
-        for line in self.head:
-            printme += f'{line[0]} --> {" ".join(line[1])}\n\t'
+        for rule, cur in self.kernel:
+            left, right = self.CFG.rules[rule]
+            line = [self.CFG.symbols[x] for x in right]
+            line.insert(cur, CURSOR)
+            printme += f'{self.CFG.symbols[left]} --> {" ".join(line)}\n\t'
         return printme
 
 
@@ -188,38 +423,53 @@ class Node:
 
 
 class FiniteAutomata:
-    def __init__(self, CFG: Grammar):
+    def __init__(self, CFG: Grammar, workers: int = None):
+        '''
+        Args:
+            workers (int): generate the FA with this many processes. see generate_FA_parallel()
+                starting the pool takes tens of milliseconds, so this only pays off for big grammars on a machine with free cores
+
+        Attributes:
+            node_tree ([Node]): every node of the FA. a node's index in this list is its state #
+            node_index ({((int, int),): int}): maps the kernel of every node created so far to its state #
+            node_queue (deque): nodes that were created but whose paths haven't been taken yet
+        '''
         self.CFG = CFG
         self.node_tree = list()
-        self.node_queue = [Node(self.CFG, [['START', [CURSOR, '<prog>']]])]
+        self.node_index = dict()
+        self.node_queue = deque()
+        if workers and workers > 1:
+            self.add_node(((0, 0),), expand=False) # START --> CURSOR <prog>
+            self.generate_FA_parallel(workers)
+            return
+        self.add_node(((0, 0),)) # START --> CURSOR <prog>
         self.generate_FA()
 
 
 
-    def move_cur(self, head: [[str, [str]]]) -> [[str, [str]]]:
-        '''Moves the cursor forward in a line(s) from a parent's body
-
-        Note:
-            each part of the argument is deep copied as issues related to double moving arose
+    def add_node(self, kernel: ((int, int),), expand: bool = True) -> int:
+        '''Gets the state # of the node with the given kernel, creating the node if it doesn't exist yet
 
         Args:
-            head ([[str, [str]]])
+            kernel (((int, int),)): must be sorted
+            expand (bool): whether to generate the body of a new node here. see Node
 
         Returns:
-            [[str, [str]]]
+            int: the state # of the node
         '''
-        new_head = []
-        for line in head:
-            line_copy = [line[0], [x for x in line[1]]]
-            index = line_copy[1].index(CURSOR) # find the cursor
-            cur = line_copy[1].pop(index) # remove the cursor
-            line_copy[1].insert(index+1, cur) # insert the cursor one space after
-            new_head.append(line_copy)
-        return new_head
+        if kernel in self.node_index:
+            return self.node_index[kernel]
+
+        node = Node(self.CFG, kernel, expand=expand)
+        node.id = len(self.node_tree)
+        self.node_index[kernel] = node.id
+        self.node_tree.append(node)
+        self.node_queue.append(node)
+        return node.id
 
 
 
-    def take_paths(self, node: Node) -> [Node]:
+    def take_paths(self, node: Node):
         '''Creates new nodes (children) based on the body of an existing node.
 
         For each line(s) of the parent's body, move the cursor forward and create a new node with that line(s)
@@ -227,25 +477,10 @@ class FiniteAutomata:
 
         Args:
             node (Node): the parent node to create children off of
-
-        Returns:
-            [Node]: a list of the children
-        '''
-        paths = list(dict.fromkeys([x[1][x[1].index(CURSOR)+1] for x in node.body if x[1].index(CURSOR) < len(x[1])-1])) # find all the possible paths that can be made
-        new_nodes = list()
-        for p in paths:
-            # the following line finds all the lines in the body whose cursor is one space behind the path
-            # ex:   [CURSOR, path]          good
-            #       [CURSOR, lorem, path]   bad: CURSOR is not one space behind path
-            #       [CURSOR, lorem]         bad: path does not exist
-            #       [lorem, CURSOR]         bad: CURSOR is at the end of the list
-            head = [x for x in node.body if x[1].index(CURSOR) < len(x[1])-1 and x[1][x[1].index(CURSOR)+1] == p]
-            head = self.move_cur(head)
-            node.paths[p] = head
-            # add children to the parent
-            if head not in self.node_tree and head not in self.node_queue: # make sure not to submit duplicate entries
-                new_nodes.append(Node(self.CFG, head))
-        return new_nodes
+        '''
+        for path, kernel in node.successors().items():
+            node.paths[path] = self.add_node(kernel)
+        node.body = None # the body is no longer needed
 
 
 
@@ -253,19 +488,122 @@ class FiniteAutomata:
         '''The main logic to generate the entire FA
         '''
         while self.node_queue:
-            node = self.node_queue.pop(0)
-            self.node_tree.append(node)
-            new_paths = self.take_paths(node)
-            self.node_queue += new_paths
+            self.take_paths(self.node_queue.popleft())
+
+
+
+    def generate_FA_parallel(self, workers: int):
+        '''Generates the entire FA with the bodies and successors of the nodes worked out in a pool of processes
+
+        The queue is taken one frontier (every node that's waiting) at a time and split into one chunk per task, workers*4 at most.
+        A worker expands every kernel of its chunk and sends back each successor kernel only once, packed into bytes (see pack_kernel()),
+        so this process only looks up each one in node_index once and only unpacks the ones that are new.
+        Chunks are merged in the same order generate_FA() would take their nodes, so the state #s are identical.
+
+        Args:
+            workers (int): how many processes to use
+        '''
+        packed_index = {pack_kernel(kernel): state for kernel, state in self.node_index.items()}
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self.CFG.CFG,)) as pool:
+            while self.node_queue:
+                frontier = list(self.node_queue)
+                self.node_queue.clear()
+                size = -(-len(frontier) // (workers*4))
+                chunks = [frontier[x:x+size] for x in range(0, len(frontier), size)]
+                results = pool.map(expand_kernels, [[pack_kernel(node.kernel) for node in chunk] for chunk in chunks])
+                for chunk, (expanded, successors) in zip(chunks, results):
+                    states = list()
+                    for packed in successors:
+                        state = packed_index.get(packed)
+                        if state is None:
+                            state = self.add_node(unpack_kernel(packed), expand=False)
+                            packed_index[packed] = state
+                        states.append(state)
+                    for node, (complete, paths, targets) in zip(chunk, expanded):
+                        node.complete = complete
+                        node.paths = {path: states[target] for path, target in zip(paths, targets)}
+                        node.body = None
+
+
+
+
+
+def pack_kernel(kernel: ((int, int),)) -> bytes:
+    '''Packs a kernel into bytes, which are much faster to send between processes than a tuple of tuples
+
+    Args:
+        kernel (((int, int),))
+
+    Returns:
+        bytes: the rule # and cursor position of each item in order, as C ints
+    '''
+    return array('i', [x for item in kernel for x in item]).tobytes()
+
+
+
+def unpack_kernel(packed: bytes) -> ((int, int),):
+    '''The opposite of pack_kernel()
+    '''
+    items = array('i')
+    items.frombytes(packed)
+    return tuple(zip(items[::2], items[1::2]))
+
+
+
+def init_worker(grammar: [[str, [str]]]):
+    '''Runs once in each process of FiniteAutomata.generate_FA_parallel() so the CFG is only sent and loaded once per process
+    '''
+    global WORKER_GRAMMAR
+    WORKER_GRAMMAR = Grammar(grammar)
+
+
+
+def expand_kernels(kernels: [bytes]) -> ([([int], [int], [int])], [bytes]):
+    '''Generates the bodies of a chunk of nodes in a worker process of FiniteAutomata.generate_FA_parallel()
+
+    Args:
+        kernels ([bytes]): see pack_kernel()
+
+    Returns:
+        ([([int], [int], [int])], [bytes]): the complete rule #s, paths and successors of each node,
+            and the packed successor kernels of the whole chunk in the order they were first found.
+            a node's successors are indexes into the second list, in the same order as its paths
+    '''
+    successors = dict()
+    expanded = list()
+    for packed in kernels:
+        node = Node(WORKER_GRAMMAR, unpack_kernel(packed))
+        paths = list()
+        targets = list()
+        for path, kernel in node.successors().items():
+            paths.append(path)
+            targets.append(successors.setdefault(pack_kernel(kernel), len(successors)))
+        expanded.append((node.complete, paths, targets))
+    return expanded, list(successors)
 
 
 
 
 
 class LRParsingTable:
-    def __init__(self, CFG: Grammar, FA: FiniteAutomata):
+    def __init__(self, CFG: Grammar, FA: FiniteAutomata, mode: str = 'SLR'):
+        '''
+        Args:
+            mode (str): how the lookaheads of the Rx cells are found
+                'SLR': every member of FOLLOW(line's left side)
+                'LALR': the LALR(1) lookaheads of the line, found by propagating lookaheads through the FA.
+                    same number of rows as SLR, but with fewer conflicts
+
+        Attributes:
+            conflicts ([(str, str, str, str)]): every (row, column, kept value, dropped value) where two values wanted the same cell
+        '''
+        if mode not in MODES:
+            raise ValueError(f'unknown LR Parsing Table mode "{mode}". expected one of {MODES}')
         self.CFG = CFG
         self.FA = FA
+        self.mode = mode
+        self.conflicts = list()
+        self.errors = set() # (row, column) cells that %nonassoc made empty
         self.table = self.blank_table()
         self.populate()
 
@@ -284,63 +622,675 @@ class LRParsingTable:
 
 
 
+    def set_cell(self, row: str, column: str, value: str):
+        '''Fills in a cell, settling conflicts the same way yacc does
+
+        A shift/reduce conflict is settled by the precedence declarations if there are any for it. see Grammar.resolve()
+        Otherwise Sn and ACC beat Rx, and a lower rule # beats a higher one, and the conflict is recorded in self.conflicts.
+        '''
+        if (row, column) in self.errors:
+            return
+        current = self.table[row].get(column)
+        if current is None or current == value:
+            self.table[row][column] = value
+            return
+
+        if current[0] == 'S' and value[0] == 'R':
+            choice = self.CFG.resolve(int(value[1:]), column)
+            if choice == 'R':
+                self.table[row][column] = value
+            elif choice == 'E':
+                del self.table[row][column]
+                self.errors.add((row, column))
+            if choice:
+                return
+
+        if current[0] == 'R' and (value[0] != 'R' or int(value[1:]) < int(current[1:])):
+            current, value = value, current
+            self.table[row][column] = current
+        self.conflicts.append((row, column, current, value))
+
+
+
     def populate(self):
         '''Populates the LR Parsing Table following these rules:
 
             1. if there is a nonterminal path P that connects nodes m to n, cell (m, P) = n
             2. if there is a terminal path p that connects nodes m to n, cell (m, p) = Sn
-            3. if there is a node n whose head contains a line with the CURSOR at the end,
-               then for every member m of FOLLOW(line's left side), cell (n, m) = Rx ; where x is the CFG rule # of line
+            3. if there is a node n whose body contains a line with the CURSOR at the end,
+               then for every lookahead m of the line, cell (n, m) = Rx ; where x is the CFG rule # of line
         '''
+        symbols = self.CFG.symbols
+        if self.mode == 'LALR':
+            lookaheads = self.lalr_lookaheads()
+        else:
+            lookaheads = {(node.id, rule): self.CFG.follow_bits[self.CFG.rules[rule][0]] for node in self.FA.node_tree for rule in node.complete if rule}
+
         for node in self.FA.node_tree:
-            cur_index = str(self.FA.node_tree.index(node))
-            if node == [['START', ['<prog>', CURSOR]]]: # special case for ACC block
-                self.table[cur_index]['$'] = 'ACC'
-                continue
+            cur_index = str(node.id)
 
             # rule 1 and 2 to generate cells with Sn and n
             for path, destination in node.paths.items():
-                dest_index = str(self.FA.node_tree.index(destination))
-                if path in self.CFG.nonterminals:   # n
-                    self.table[cur_index][path] = dest_index
-                elif path in self.CFG.terminals:    # Sn
-                    self.table[cur_index][path] = 'S' + dest_index
+                if self.CFG.is_nonterminal(path):   # n
+                    self.table[cur_index][symbols[path]] = str(destination)
+                else:                               # Sn
+                    self.table[cur_index][symbols[path]] = 'S' + str(destination)
 
             # rule 3 to genereate cells with Rx
-            for line in node.head:
-                if line[1][-1] == CURSOR:
-                    for ele in self.CFG.FOLLOW[line[0]]:
-                        self.table[cur_index][ele] = 'R' + str(self.CFG.CFG.index([line[0], line[1][:-1]])+1)
+            for rule in node.complete:
+                if rule == 0: # special case for ACC block. START --> <prog> CURSOR
+                    self.set_cell(cur_index, '$', 'ACC')
+                    continue
+                for ele in self.CFG.terminal_names(lookaheads[(node.id, rule)]):
+                    self.set_cell(cur_index, ele, 'R' + str(rule))
+
+
+
+    def closure(self, items: {(int, int): int}) -> {(int, int): int}:
+        '''Generates the LR(1) body of some lines
+
+        Args:
+            items ({(int, int): int}): keys are items, values are the bitsets of their lookaheads
+
+        Returns:
+            {(int, int): int}: the lines plus every line generated from them, with their lookaheads
+        '''
+        body = dict(items)
+        worklist = list(body)
+        while worklist:
+            rule, cur = worklist.pop()
+            right = self.CFG.rules[rule][1]
+            if cur == len(right) or not self.CFG.is_nonterminal(right[cur]):
+                continue
+
+            first, nullable = self.CFG.first_of(right[cur+1:])
+            if nullable:
+                first |= body[(rule, cur)]
+            for prod in self.CFG.productions[right[cur]]:
+                old = body.get((prod, 0), 0)
+                if (prod, 0) not in body or old | first != old: # a line belongs in the body even if it has no lookaheads
+                    body[(prod, 0)] = old | first
+                    worklist.append((prod, 0))
+        return body
+
+
+
+    def lalr_lookaheads(self) -> {(int, int): int}:
+        '''Finds the LALR(1) lookaheads of every line whose CURSOR is at the end
+
+        For each kernel line, its body is generated with a placeholder lookahead (#).
+        A lookahead other than # that reaches a line of a child node is generated spontaneously,
+        while # reaching a line means the kernel line's lookaheads propagate to it.
+        Lookaheads are then pushed along those propagation edges until nothing changes.
+
+        Returns:
+            {(int, int): int}: keys are (state #, rule #), values are the bitsets of the lookaheads
+        '''
+        placeholder = 1 << len(self.CFG.symbols)
+        nodes = self.FA.node_tree
+        lookaheads = {(node.id, item): 0 for node in nodes for item in node.kernel}
+        lookaheads[(0, (0, 0))] = 1 << self.CFG.symbol_ids['$']
+        edges = {key: [] for key in lookaheads}
+        empty = dict() # {(state #, rule #): [(spontaneous lookaheads, kernel line it propagates from)]} for lines with an empty right side
+
+        for node in nodes:
+            for item in node.kernel:
+                source = (node.id, item)
+                for (rule, cur), bits in self.closure({item: placeholder}).items():
+                    right = self.CFG.rules[rule][1]
+                    if cur == len(right):
+                        if cur == 0:
+                            empty.setdefault((node.id, rule), []).append((bits & ~placeholder, source if bits & placeholder else None))
+                        continue
+                    target = (node.paths[right[cur]], (rule, cur+1))
+                    lookaheads[target] |= bits & ~placeholder
+                    if bits & placeholder:
+                        edges[source].append(target)
+
+        worklist = list(lookaheads)
+        while worklist:
+            source = worklist.pop()
+            for target in edges[source]:
+                merged = lookaheads[target] | lookaheads[source]
+                if merged != lookaheads[target]:
+                    lookaheads[target] = merged
+                    worklist.append(target)
+
+        result = dict()
+        for node in nodes:
+            for rule, cur in node.kernel:
+                if cur == len(self.CFG.rules[rule][1]):
+                    result[(node.id, rule)] = lookaheads[(node.id, (rule, cur))]
+        for key, sources in empty.items():
+            result[key] = 0
+            for bits, source in sources:
+                result[key] |= bits | (lookaheads[source] if source else 0)
+        return result
+
+
+
+
+
+class DenseTable:
+    def __init__(self, table: {str: {str: str}}, terminals: [str], rules: [[str, int]]):
+        '''An integer encoded copy of an LR Parsing Table, so a parser never has to decode strings like 'S12' or 'R7'
+
+        Each action cell is one int:
+            ERROR (0): the cell is empty
+            n > 0: Sn-1
+            ACCEPT (-1): ACC
+            n < -1: R(-n-1)
+
+        Args:
+            table ({str: {str: str}}): see convert()
+            terminals ([str]): see terminals()
+            rules ([[str, int]]): see Grammar.rule_metadata()
+
+        Attributes:
+            terminal_ids ({str: int}): the column # of each terminal in the action rows
+            unknown (int): an extra action column that is always ERROR. used for words that aren't terminals
+            nonterminal_ids ({str: int}): the column # of each nonterminal in the goto rows
+            action ([array]): indexed by state # then terminal column #
+            goto ([array]): indexed by state # then nonterminal column #. -1 if the cell is empty
+            rule_left (array): the nonterminal column # of each rule #'s left side. -1 for rule 0
+            rule_length (array): the length of each rule #'s right side
+        '''
+        self.terminals = list(terminals)
+        self.nonterminals = list(dict.fromkeys(left for left, _ in rules[1:]))
+        self.terminal_ids = {name: index for index, name in enumerate(self.terminals)}
+        self.nonterminal_ids = {name: index for index, name in enumerate(self.nonterminals)}
+        self.unknown = len(self.terminals)
+        self.rule_left = array('i', [self.nonterminal_ids.get(left, -1) for left, _ in rules])
+        self.rule_length = array('i', [length for _, length in rules])
+
+        self.action = list()
+        self.goto = list()
+        for num in range(len(table)):
+            action = array('i', [ERROR]) * (len(self.terminals)+1)
+            goto = array('i', [-1]) * len(self.nonterminals)
+            for column, value in table[str(num)].items():
+                if column in self.nonterminal_ids:
+                    goto[self.nonterminal_ids[column]] = int(value)
+                elif value == 'ACC':
+                    action[self.terminal_ids[column]] = ACCEPT
+                elif value[0] == 'S':
+                    action[self.terminal_ids[column]] = int(value[1:]) + 1
+                else:
+                    action[self.terminal_ids[column]] = -int(value[1:]) - 1
+            self.action.append(action)
+            self.goto.append(goto)
+
+
+
+    def action_at(self, state: int, column: int) -> int:
+        return self.action[state][column]
+
+
+
+    def goto_at(self, state: int, column: int) -> int:
+        return self.goto[state][column]
+
+
+
+    def has_action(self, state: int, column: int) -> bool:
+        '''Checks whether an action cell is non empty. see PackedTable.has_action()
+        '''
+        return self.action[state][column] != ERROR
+
+
+
+    def has_goto(self, state: int, column: int) -> bool:
+        '''Checks whether a goto cell is non empty. see PackedTable.has_goto()
+        '''
+        return self.goto[state][column] != -1
+
+
+
+    def expected(self, state: int) -> [str]:
+        '''Gets the terminals that have a non empty cell in a row
+
+        Args:
+            state (int)
+
+        Returns:
+            [str]
+        '''
+        row = self.action[state]
+        return [name for index, name in enumerate(self.terminals) if row[index] != ERROR]
+
+
+
+
+
+class LazyTable:
+    def __init__(self, CFG: Grammar):
+        '''An SLR table whose nodes and rows are only generated the first time a parser reads from them
+
+        A program only ever visits a small part of the FA, so when a table is only used to parse one program
+        this skips most of the work of build(). It has the same interface as DenseTable,
+        but its state #s are numbered in the order the parser reaches them.
+
+        Note:
+            LALR lookaheads need the whole FA to be known, so lazy tables are always SLR
+
+        Attributes:
+            kernels ([((int, int),)]): the kernel of every node found so far. a kernel's index is its state #
+            kernel_index ({((int, int),): int}): maps each kernel in kernels to its state #
+            action ([array]): the rows generated so far. None for nodes that were found but haven't been read from yet
+            goto ([array])
+            conflicts (int): how many conflicts were settled in the rows generated so far. see LRParsingTable.set_cell()
+        '''
+        self.CFG = CFG
+        self.terminals = CFG.terminals
+        self.nonterminals = CFG.nonterminals
+        self.terminal_ids = {name: index for index, name in enumerate(self.terminals)}
+        self.nonterminal_ids = {name: index for index, name in enumerate(self.nonterminals)}
+        self.unknown = len(self.terminals)
+        self.rule_left = array('i', [left if CFG.is_nonterminal(left) else -1 for left, _ in CFG.rules])
+        self.rule_length = array('i', [len(right) for _, right in CFG.rules])
+
+        self.kernels = [((0, 0),)] # START --> CURSOR <prog>
+        self.kernel_index = {self.kernels[0]: 0}
+        self.action = [None]
+        self.goto = [None]
+        self.conflicts = 0
+
+
+
+    def expand(self, state: int):
+        '''Generates the node of a state # and fills in its row
+
+        Args:
+            state (int)
+        '''
+        CFG = self.CFG
+        offset = len(self.nonterminals) # terminal symbol ids come right after the nonterminal ids
+        node = Node(CFG, self.kernels[state])
+        action = array('i', [ERROR]) * (len(self.terminals)+1)
+        goto = array('i', [-1]) * len(self.nonterminals)
+
+        for path, kernel in node.successors().items():
+            target = self.kernel_index.get(kernel)
+            if target is None: # a new node. it's only generated once a parser reaches it
+                target = len(self.kernels)
+                self.kernels.append(kernel)
+                self.kernel_index[kernel] = target
+                self.action.append(None)
+                self.goto.append(None)
+            if CFG.is_nonterminal(path):
+                goto[path] = target
+            else:
+                action[path-offset] = target + 1
+
+        errors = set() # columns that %nonassoc made empty
+        for rule in sorted(node.complete): # lower rule #s go first so they win reduce/reduce conflicts
+            if rule == 0:
+                value = ACCEPT
+                follow = 1 << CFG.symbol_ids['$']
+            else:
+                value = -rule - 1
+                follow = CFG.follow_bits[CFG.rules[rule][0]]
+            for column in range(len(self.terminals)):
+                if not follow >> (column+offset) & 1 or column in errors:
+                    continue
+                if action[column] == ERROR:
+                    action[column] = value
+                elif action[column] != value:
+                    choice = CFG.resolve(rule, self.terminals[column]) if action[column] > 0 and rule else None
+                    if choice == 'R':
+                        action[column] = value
+                    elif choice == 'E':
+                        action[column] = ERROR
+                        errors.add(column)
+                    elif not choice:
+                        self.conflicts += 1
+
+        self.action[state] = action
+        self.goto[state] = goto
+
+
+
+    def action_at(self, state: int, column: int) -> int:
+        row = self.action[state]
+        if row is None:
+            self.expand(state)
+            row = self.action[state]
+        return row[column]
+
+
+
+    def goto_at(self, state: int, column: int) -> int:
+        if self.goto[state] is None:
+            self.expand(state)
+        return self.goto[state][column]
+
+
+
+    def has_action(self, state: int, column: int) -> bool:
+        return self.action_at(state, column) != ERROR
+
+
+
+    def has_goto(self, state: int, column: int) -> bool:
+        return self.goto_at(state, column) != -1
+
+
+
+    def expected(self, state: int) -> [str]:
+        if self.action[state] is None:
+            self.expand(state)
+        row = self.action[state]
+        return [name for index, name in enumerate(self.terminals) if row[index] != ERROR]
+
+
+
+    def built(self) -> int:
+        '''Gets how many rows have been generated so far
+        '''
+        return sum(1 for row in self.action if row is not None)
+
+
+
+
+
+class PackedTable:
+    def __init__(self, filename: str):
+        '''A compressed, read only LR Parsing Table that is used straight from a memory mapped file
+
+        Nothing is unpickled or copied when the file is opened, so every process that opens the same file shares one copy of it.
+        Use PackedTable.write() to create the file from a DenseTable.
+
+        The action and goto rows are compressed into comb vectors (row displacement):
+            each row gets a default value, and only the cells that differ from it are stored.
+            the stored cells of every row are overlapped into one next array at an offset of base[row],
+            and check[base[row] + column] == row tells whether a cell was stored for that row or the default applies.
+        The default of an action row is its most common Rx, or ERROR if it has none.
+        The default of a goto cell is the most common value of its column.
+        Cells that match the default aren't stored, so the check arrays can't tell an empty cell from one that holds the default.
+        A bitmap of the non empty cells of each row is stored as well for the callers that need to know. see has_action()
+
+        Args:
+            filename (str): a file created by PackedTable.write()
+
+        Attributes:
+            same as DenseTable, except that action and goto are replaced with action_at() and goto_at()
+            action_words (int): how many ints each row of action_valid takes up
+            goto_words (int): how many ints each row of goto_valid takes up
+        '''
+        with open(filename, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map).cast('i')
+
+        magic, version, states, columns, nonterminals, rules, action_size, goto_size, names_size = self.view[:9].tolist()
+        if magic != PACKED_MAGIC or version != PACKED_VERSION:
+            self.close()
+            raise ValueError(f'{filename} is not a version {PACKED_VERSION} packed LR Parsing Table')
+
+        self.action_words = (columns+31) // 32
+        self.goto_words = (nonterminals+31) // 32
+        offset = 9
+        sizes = (states, states, action_size, action_size, states*self.action_words,
+                 states, nonterminals, goto_size, goto_size, states*self.goto_words, rules, rules)
+        sections = list()
+        for size in sizes:
+            sections.append(self.view[offset:offset+size])
+            offset += size
+        (self.action_base, self.action_default, self.action_next, self.action_check, self.action_valid,
+         self.goto_base, self.goto_default, self.goto_next, self.goto_check, self.goto_valid,
+         self.rule_left, self.rule_length) = sections
+
+        names = json.loads(bytes(self.map[offset*4:offset*4+names_size]).decode('utf8'))
+        self.terminals = names['terminals']
+        self.nonterminals = names['nonterminals']
+        self.terminal_ids = {name: index for index, name in enumerate(self.terminals)}
+        self.nonterminal_ids = {name: index for index, name in enumerate(self.nonterminals)}
+        self.unknown = len(self.terminals)
+        self.states = states
+
+
+
+    def action_at(self, state: int, column: int) -> int:
+        index = self.action_base[state] + column
+        if index < len(self.action_check) and self.action_check[index] == state:
+            return self.action_next[index]
+        return self.action_default[state]
+
+
+
+    def goto_at(self, state: int, column: int) -> int:
+        index = self.goto_base[state] + column
+        if index < len(self.goto_check) and self.goto_check[index] == state:
+            return self.goto_next[index]
+        return self.goto_default[column]
+
+
+
+    def has_action(self, state: int, column: int) -> bool:
+        '''Checks whether an action cell is non empty
+
+        action_at() can't be used for this since it returns the row's default for empty cells.
+
+        Args:
+            state (int)
+            column (int)
+
+        Returns:
+            bool
+        '''
+        return bool(self.action_valid[state*self.action_words + column//32] >> column%32 & 1)
+
+
+
+    def has_goto(self, state: int, column: int) -> bool:
+        '''Checks whether a goto cell is non empty. see has_action()
+        '''
+        return bool(self.goto_valid[state*self.goto_words + column//32] >> column%32 & 1)
+
+
+
+    def expected(self, state: int) -> [str]:
+        '''Gets the terminals that have a non empty cell in a row
+
+        Note:
+            a row whose default is a reduce never fails, so a parser finds an error a few reduces later than it would with a DenseTable.
+            the row it fails in can expect fewer terminals than the one a DenseTable would have failed in.
+
+        Args:
+            state (int)
+
+        Returns:
+            [str]
+        '''
+        return [name for index, name in enumerate(self.terminals) if self.has_action(state, index)]
+
+
+
+    def rule_metadata(self) -> [[str, int]]:
+        '''Gets what the parser needs to know about each rule # to reduce by it, the same as Grammar.rule_metadata()
+
+        Returns:
+            [[str, int]]: the left side and the length of the right side of each rule #. rule 0 is START --> <prog>
+        '''
+        return [['START' if left == -1 else self.nonterminals[left], length] for left, length in zip(self.rule_left, self.rule_length)]
+
+
+
+    def close(self):
+        '''Releases the memory map. the table can't be used afterwards
+        '''
+        for name in ('action_base', 'action_default', 'action_next', 'action_check', 'action_valid',
+                     'goto_base', 'goto_default', 'goto_next', 'goto_check', 'goto_valid', 'rule_left', 'rule_length'):
+            if hasattr(self, name):
+                getattr(self, name).release()
+        self.view.release()
+        self.map.close()
+
+
+
+    @staticmethod
+    def comb(rows: [{int: int}]) -> ([int], [int], [int]):
+        '''Overlaps sparse rows into one pair of next and check arrays
+
+        The rows with the most cells are placed first, each one at the lowest offset where none of its cells collide with a stored cell.
+        Only offsets that put a row's first column on a free slot are tried, and after COMB_TRIES of them the row goes after every stored cell,
+        so writing a big table doesn't slow down with the square of its size.
+
+        Args:
+            rows ([{int: int}]): the stored cells of each row. keys are column #s
+
+        Returns:
+            ([int], [int], [int]): the base of each row, the next array and the check array
+        '''
+        base = [0] * len(rows)
+        next_ = list()
+        check = list()
+        used = bytearray() # 1 for every slot of check that holds a cell
+        first_free = 0
+        for row in sorted(range(len(rows)), key=lambda x: -len(rows[x])):
+            columns = sorted(rows[row])
+            if not columns:
+                continue
+
+            first = columns[0]
+            slot = max(first_free, first)
+            for _ in range(COMB_TRIES):
+                offset = slot - first
+                if not any(offset+x < len(used) and used[offset+x] for x in columns):
                     break
+                slot = used.find(0, slot+1)
+                if slot == -1: # every slot after it is taken, so the row goes at the end
+                    slot = len(used)
+            else:
+                offset = max(0, len(used) - first)
+
+            if offset + columns[-1] >= len(check):
+                grow = offset + columns[-1] + 1 - len(check)
+                next_ += [ERROR] * grow
+                check += [-1] * grow
+                used += bytes(grow)
+            for column in columns:
+                next_[offset+column] = rows[row][column]
+                check[offset+column] = row
+                used[offset+column] = 1
+            base[row] = offset
+
+            first_free = used.find(0, first_free)
+            if first_free == -1:
+                first_free = len(used)
+        return base, next_, check
+
+
+
+    @staticmethod
+    def bitmap(cells: [bool]) -> [int]:
+        '''Packs the cells of a row into 32 bit ints, lowest column first
+
+        Args:
+            cells ([bool])
+
+        Returns:
+            [int]: signed, so they fit in an array('i')
+        '''
+        words = list()
+        for start in range(0, len(cells), 32):
+            word = sum(1 << bit for bit, cell in enumerate(cells[start:start+32]) if cell)
+            words.append(word - (1 << 32) if word >= 1 << 31 else word)
+        return words
+
 
 
+    @staticmethod
+    def write(table: DenseTable, filename: str):
+        '''Compresses a DenseTable and writes it to a file that PackedTable can open
+
+        Args:
+            table (DenseTable)
+            filename (str)
+        '''
+        action_rows = list()
+        action_default = list()
+        for row in table.action:
+            reduces = [x for x in row if x < ACCEPT]
+            default = max(set(reduces), key=reduces.count) if reduces else ERROR
+            action_default.append(default)
+            action_rows.append({column: value for column, value in enumerate(row) if value != default and value != ERROR})
 
+        goto_default = list()
+        for column in range(len(table.nonterminals)):
+            values = [row[column] for row in table.goto if row[column] != -1]
+            goto_default.append(max(set(values), key=values.count) if values else -1)
+        goto_rows = [{column: value for column, value in enumerate(row) if value != -1 and value != goto_default[column]} for row in table.goto]
 
+        action_base, action_next, action_check = PackedTable.comb(action_rows)
+        goto_base, goto_next, goto_check = PackedTable.comb(goto_rows)
+        action_valid = [word for row in table.action for word in PackedTable.bitmap([x != ERROR for x in row])]
+        goto_valid = [word for row in table.goto for word in PackedTable.bitmap([x != -1 for x in row])]
 
-def convert(grammar: [[str, [str]]]) -> {str: {str: str}}:
+        names = json.dumps({'terminals': table.terminals, 'nonterminals': table.nonterminals}).encode('utf8')
+        header = [PACKED_MAGIC, PACKED_VERSION, len(table.action), len(table.terminals)+1, len(table.nonterminals), len(table.rule_left),
+                  len(action_next), len(goto_next), len(names)]
+        ints = array('i', header + action_base + action_default + action_next + action_check + action_valid
+                     + goto_base + goto_default + goto_next + goto_check + goto_valid + list(table.rule_left) + list(table.rule_length))
+
+        # write to a temporary file first so other processes never map a half written file
+        temp = f'{filename}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as file:
+            file.write(ints.tobytes())
+            file.write(names)
+            file.write(bytes(-len(names) % 4)) # pad to a whole number of ints so the file can be cast to ints
+        os.replace(temp, filename)
+
+
+
+
+
+def build(grammar: [[str, [str]]], mode: str = 'SLR', workers: int = None) -> LRParsingTable:
     '''Converts a CFG to FA to LR Parsing Table
 
     Args:
         grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        mode (str): 'SLR' or 'LALR'. see LRParsingTable
+        workers (int): how many processes to generate the FA with. see FiniteAutomata.generate_FA_parallel()
 
     Returns:
-        {str: {str: str}}: The LR Parsing Table converted into a dictionary of dictionaries for ease of use
-
-    Note:
-        In order to access a cell in the LR Parsing Table (the return variable), use LR[row number][terminal or nonterminal]
+        LRParsingTable: the table along with the Grammar and FiniteAutomata it was built from
     '''
     print('loading CFG...', end=' ')
     CFG = Grammar(grammar)
     print('ok')
 
     print('converting CFG to FA...', end=' ')
-    FA = FiniteAutomata(CFG)
+    FA = FiniteAutomata(CFG, workers=workers)
     print('ok')
 
     print('converting FA to LR Parsing Table...', end=' ')
-    LR = LRParsingTable(CFG, FA)
+    LR = LRParsingTable(CFG, FA, mode)
     print('ok')
+    if LR.conflicts:
+        print(f'warning: {len(LR.conflicts)} conflicts in the {mode} LR Parsing Table were settled in favor of Sn or the lowest rule #')
+
+    return LR
 
+
+
+def convert(grammar: [[str, [str]]], mode: str = 'SLR', dense: bool = False, workers: int = None) -> {str: {str: str}}:
+    '''Converts a CFG to FA to LR Parsing Table
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        mode (str): 'SLR' or 'LALR'. see LRParsingTable
+        dense (bool): return a DenseTable instead
+        workers (int): see build()
+
+    Returns:
+        {str: {str: str}}: The LR Parsing Table converted into a dictionary of dictionaries for ease of use
+
+    Note:
+        In order to access a cell in the LR Parsing Table (the return variable), use LR[row number][terminal or nonterminal]
+    '''
+    LR = build(grammar, mode, workers)
+    if dense:
+        return DenseTable(LR.table, LR.CFG.terminals, LR.CFG.rule_metadata())
     return LR.table
 
 
@@ -355,4 +1305,116 @@ def terminals(grammar: [[str, [str]]]) -> [str]:
         [str]: each element is a different terminal
     '''
     CFG = Grammar(grammar)
-    return CFG.terminals
\ No newline at end of file
+    return CFG.terminals
+
+
+
+def split_declarations(grammar: [[str, [str]]]) -> ([[str, [str]]], [[str, [str]]]):
+    '''Separates the rules of a CFG from its precedence declarations, like ["%left", ["+", "-"]]
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+
+    Returns:
+        ([[str, [str]]], [[str, [str]]]): the rules and the declarations, both in the order they're written
+    '''
+    rules = [x for x in grammar if x[0] not in ASSOCIATIVITY]
+    declarations = [x for x in grammar if x[0] in ASSOCIATIVITY]
+    return rules, declarations
+
+
+
+def grammar_hash(grammar: [[str, [str]]], mode: str = 'SLR') -> str:
+    '''Hashes the contents of a CFG along with the table mode and the cache format version
+
+    Args:
+        grammar ([[str, [str]]])
+        mode (str)
+
+    Returns:
+        str: a hex digest that changes whenever the CFG, the mode or the cache format changes
+    '''
+    contents = json.dumps([CACHE_VERSION, mode, grammar], separators=(',', ':'))
+    return hashlib.sha256(contents.encode('utf8')).hexdigest()
+
+
+
+def load(grammar: [[str, [str]]], mode: str = 'SLR', cache_dir: str = CACHE_DIR, workers: int = None) -> dict:
+    '''Gets the LR Parsing Table of a CFG from the cache, building and caching it if it isn't there yet
+
+    A cache file is named after the grammar_hash() of its CFG, so editing the CFG or bumping CACHE_VERSION
+    automatically stops old files from being used. Files that can't be read or have the wrong version are rebuilt.
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        mode (str): 'SLR' or 'LALR'. see LRParsingTable
+        cache_dir (str): the folder that holds the cache files. None disables the cache
+        workers (int): see build(). only used if the table isn't cached
+
+    Returns:
+        dict: {
+            'table': {str: {str: str}}: the LR Parsing Table. see convert()
+            'terminals': [str]: see terminals()
+            'rules': [[str, int]]: the left side and right side length of each rule #. rule 0 is START --> <prog>
+        }
+    '''
+    key = grammar_hash(grammar, mode)
+    filename = os.path.join(cache_dir, key + '.json') if cache_dir else None
+
+    if filename and os.path.exists(filename):
+        print('loading LR Parsing Table from cache...', end=' ')
+        try:
+            with open(filename, 'r', encoding='utf8') as file:
+                cached = json.load(file)
+            if cached.get('version') == CACHE_VERSION and cached.get('hash') == key:
+                print('ok')
+                return cached
+        except (OSError, ValueError):
+            pass
+        print('stale')
+
+    LR = build(grammar, mode, workers)
+    CFG = LR.CFG
+    cached = {
+        'version': CACHE_VERSION,
+        'hash': key,
+        'table': LR.table,
+        'terminals': CFG.terminals,
+        'rules': CFG.rule_metadata()
+    }
+
+    if filename:
+        # write to a temporary file first so other processes never read a half written cache file
+        os.makedirs(cache_dir, exist_ok=True)
+        temp = f'{filename}.{os.getpid()}.tmp'
+        with open(temp, 'w', encoding='utf8') as file:
+            json.dump(cached, file)
+        os.replace(temp, filename)
+
+    return cached
+
+
+
+def load_packed(grammar: [[str, [str]]], mode: str = 'SLR', cache_dir: str = CACHE_DIR, workers: int = None) -> PackedTable:
+    '''Opens the PackedTable of a CFG from the cache, creating it if it isn't there yet
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        mode (str): 'SLR' or 'LALR'. see LRParsingTable
+        cache_dir (str): the folder that holds the cache files
+        workers (int): see build(). only used if the table isn't cached
+
+    Returns:
+        PackedTable
+    '''
+    filename = os.path.join(cache_dir, grammar_hash(grammar, mode) + '.lrpk')
+    if os.path.exists(filename):
+        try:
+            return PackedTable(filename)
+        except (OSError, ValueError):
+            pass
+
+    lr = load(grammar, mode, cache_dir, workers)
+    os.makedirs(cache_dir, exist_ok=True)
+    PackedTable.write(DenseTable(lr['table'], lr['terminals'], lr['rules']), filename)
+    return PackedTable(filename)
@@ -0,0 +1,191 @@
+# standard libraries
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import time
+
+# local modules
+import compiler
+import translator
+
+
+
+# global variables
+WORKER_COMPILER = None  # the Compiler a worker process reuses for every file it's given
+WORKER_KEYWORDS = None  # the terminals of the CFG. see translator.tokenize()
+WORKER_OUTPUT = None    # the folder a worker process writes its results to
+
+
+
+def init_worker(grammar: [[str, [str]]], options: dict, output_dir: str):
+    '''Sets up a worker process
+
+    Forked workers already have the Compiler that main() made before starting the pool, with its tables loaded.
+    Otherwise the tables are loaded from the cache that main() filled, which is still much faster than building them.
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        options (dict): the keyword arguments of the Compiler
+        output_dir (str): see compile_file()
+    '''
+    global WORKER_COMPILER, WORKER_KEYWORDS, WORKER_OUTPUT
+    if WORKER_COMPILER is None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            WORKER_COMPILER = compiler.Compiler(grammar, [], **options)
+    WORKER_KEYWORDS = WORKER_COMPILER.TERMINALS
+    WORKER_OUTPUT = output_dir
+
+
+
+def compile_file(job: (str, str)) -> dict:
+    '''Compiles one source file in a worker process
+
+    Everything the compiler prints is saved to <name>.log instead of being printed.
+
+    Args:
+        job ((str, str)): the source file and the name to give its results.
+            they are written to <name>.tokens.txt (see translator.translate()), <name>.py and <name>.log
+
+    Returns:
+        dict: the source file, whether it compiled, how many errors it had, its output files and how many seconds it took
+    '''
+    source, name = job
+    base = os.path.join(WORKER_OUTPUT, name)
+    result = {'source': source, 'ok': False, 'errors': 0, 'output': None, 'log': base + '.log'}
+
+    start = time.perf_counter()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            words = translator.translate(source, base + '.tokens.txt', WORKER_KEYWORDS)
+            WORKER_COMPILER.reset(words)
+            result['output'] = WORKER_COMPILER.compile(base + '.py')
+            result['ok'] = result['output'] is not None
+            result['errors'] = WORKER_COMPILER.errors
+        except Exception as error: # one broken file shouldn't stop the rest of the batch
+            print(f'\n\nERROR: {type(error).__name__}: {error}')
+            result['errors'] = max(WORKER_COMPILER.errors, 1)
+    result['seconds'] = time.perf_counter() - start
+
+    with open(result['log'], 'w', encoding='utf8') as file:
+        file.write(log.getvalue())
+    return result
+
+
+
+def find_sources(paths: [str], extension: str) -> [str]:
+    '''Gets every source file in a list of files and folders
+
+    Args:
+        paths ([str]): files are used as they are and folders are searched recursively
+        extension (str): only files in folders that end with this are used. ex: .txt
+
+    Returns:
+        [str]
+    '''
+    sources = list()
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, _, files in sorted(os.walk(path)):
+                sources += [os.path.join(folder, x) for x in sorted(files) if x.endswith(extension)]
+        else:
+            sources.append(path)
+    return sources
+
+
+
+def name_results(sources: [str]) -> [(str, str)]:
+    '''Names the results of each source file after the file, adding a number if two files have the same name
+
+    Returns:
+        [(str, str)]: the jobs for compile_file()
+    '''
+    used = dict()
+    jobs = list()
+    for source in sources:
+        name = os.path.splitext(os.path.basename(source))[0]
+        used[name] = used.get(name, 0) + 1
+        if used[name] > 1:
+            name = f'{name}_{used[name]}'
+        jobs.append((source, name))
+    return jobs
+
+
+
+def main(grammar: [[str, [str]]], sources: [str], output_dir: str, workers: int, options: dict) -> dict:
+    '''Compiles many source files with a pool of worker processes
+
+    The tables are loaded once before the pool starts, which also makes sure the cache is filled for workers that don't fork.
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        sources ([str]): the source files
+        output_dir (str): the folder to write the results to
+        workers (int): how many processes to compile with
+        options (dict): the keyword arguments of the Compiler
+
+    Returns:
+        dict: the summary of the batch, along with the result of each file. see compile_file()
+    '''
+    global WORKER_COMPILER
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = name_results(sources)
+
+    print('loading LR Parsing Table...')
+    WORKER_COMPILER = compiler.Compiler(grammar, [], **options)
+
+    print(f'compiling {len(jobs)} files with {workers} workers...', end=' ')
+    start = time.perf_counter()
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork') # the workers inherit WORKER_COMPILER
+    else:
+        context = multiprocessing.get_context()
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker, initargs=(grammar, options, output_dir)) as pool:
+        chunksize = max(1, len(jobs) // (workers*4))
+        results = list(pool.map(compile_file, jobs, chunksize=chunksize))
+    seconds = time.perf_counter() - start
+    print('ok')
+
+    summary = {
+        'files': len(results),
+        'compiled': sum(1 for x in results if x['ok']),
+        'failed': sum(1 for x in results if not x['ok']),
+        'errors': sum(x['errors'] for x in results),
+        'workers': workers,
+        'seconds': seconds,
+        'files_per_second': len(results) / seconds if seconds else 0,
+        'results': results
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf8') as file:
+        json.dump(summary, file, indent=4)
+    return summary
+
+
+
+if __name__ in '__main__':
+    parser = argparse.ArgumentParser(description='compiles many source files at once with a pool of worker processes')
+    parser.add_argument('paths', nargs='+', help='source files, or folders to search for them')
+    parser.add_argument('--grammar', default='CFG.json', help='the CFG file (default: CFG.json)')
+    parser.add_argument('--output', default='build', help='the folder to write the results to (default: build)')
+    parser.add_argument('--extension', default='.txt', help='the extension of the source files in folders (default: .txt)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='how many processes to compile with (default: one per core)')
+    parser.add_argument('--packed', action='store_true', help='parse with a memory mapped table. see CFGtoLR.PackedTable')
+    parser.add_argument('--normalize', action='store_true', help='build the tables from a normalized CFG. see normalizer.normalize()')
+    args = parser.parse_args()
+
+    with open(args.grammar, 'r') as file:
+        CFG = json.load(file)
+    sources = find_sources(args.paths, args.extension)
+    summary = main(CFG, sources, args.output, args.workers, {'packed': args.packed, 'normalize': args.normalize})
+
+    for result in summary['results']:
+        if not result['ok']:
+            print(f'FAILED {result["source"]} ({result["errors"]} errors). see {result["log"]}')
+    print(f'{summary["compiled"]} of {summary["files"]} files compiled in {summary["seconds"]:.2f}s ({summary["files_per_second"]:.1f} files/s)')
+    print(f'summary written to {os.path.join(args.output, "summary.json")}')
+    if summary['failed']:
+        raise SystemExit(1)
@@ -0,0 +1,219 @@
+# standard libraries
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+# local modules
+import CFGtoLR
+
+
+
+# the grammar every sweep starts from. each sweep changes one of these at a time
+BASE_PARAMS = {
+    'nonterminals': 40,
+    'alternatives': 3,
+    'length': 3,
+    'recursion': 3,
+    'terminals': 20
+}
+SWEEPS = {
+    'nonterminals': [20, 40, 80, 160],
+    'alternatives': [2, 3, 5, 8],
+    'length': [2, 3, 5, 8],
+    'recursion': [0, 3, 10, 30],
+    'terminals': [10, 20, 50, 200]
+}
+
+
+
+def generate_grammar(nonterminals: int, alternatives: int, length: int, recursion: int, terminals: int, seed: int = 0) -> [[str, [str]]]:
+    '''Generates a random CFG in the same format as CFG.json
+
+    The first nonterminals form a left recursive chain like <expr> --> <expr> + <term> | <term>, <term> --> <term> * <factor> | <factor>.
+    Every other production mixes random terminals with nonterminals that come later in the list. Since the first production of each
+    nonterminal starts with a terminal and only refers to later nonterminals, every nonterminal can produce a string.
+
+    Args:
+        nonterminals (int): how many nonterminals there are
+        alternatives (int): how many productions each nonterminal has
+        length (int): how many symbols are on the right side of each production
+        recursion (int): how long the chain of left recursive nonterminals is
+        terminals (int): how many terminals there are
+        seed (int): the same arguments and seed always give the same CFG
+
+    Returns:
+        [[str, [str]]]
+    '''
+    rng = random.Random(seed)
+    names = [f'<n{x}>' for x in range(nonterminals)]
+    alphabet = [f't{x}' for x in range(terminals)]
+    recursion = min(recursion, nonterminals-1)
+
+    grammar = list()
+    for index, name in enumerate(names):
+        later = names[index+1:]
+        if index < recursion:
+            # <n0> --> <n0> t <n1> | <n1>
+            grammar.append([name, [name, alphabet[index % terminals], names[index+1]]])
+            grammar.append([name, [names[index+1]]])
+            count = alternatives - 2
+        else:
+            count = alternatives
+
+        for alternative in range(count):
+            right = list()
+            for _ in range(length):
+                if later and (alternative > 0 or len(right) > 0) and rng.random() < 0.4:
+                    right.append(rng.choice(later))
+                else:
+                    right.append(rng.choice(alphabet))
+            grammar.append([name, right])
+    return grammar
+
+
+
+def measure(grammar: [[str, [str]]], mode: str, repeat: int, workers: int = None) -> dict:
+    '''Times each phase of CFGtoLR.build() separately and measures the peak memory of the whole build
+
+    Args:
+        grammar ([[str, [str]]])
+        mode (str): 'SLR' or 'LALR'
+        repeat (int): each phase's time is the fastest of this many runs
+        workers (int): also time the FA generated with this many processes (the 'parallel' phase).
+            see FiniteAutomata.generate_FA_parallel()
+
+    Returns:
+        dict: the sizes of the results, the seconds spent in each phase and the peak memory in bytes.
+            with workers, also the parallel FA's speedup and whether it's the same as the serial one
+    '''
+    times = {'grammar': [], 'automaton': [], 'table': []}
+    if workers:
+        times['parallel'] = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        CFG = CFGtoLR.Grammar(grammar)
+        times['grammar'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        FA = CFGtoLR.FiniteAutomata(CFG)
+        times['automaton'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        LR = CFGtoLR.LRParsingTable(CFG, FA, mode)
+        times['table'].append(time.perf_counter() - start)
+
+        if workers:
+            start = time.perf_counter()
+            parallel = CFGtoLR.FiniteAutomata(CFG, workers)
+            times['parallel'].append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    CFG = CFGtoLR.Grammar(grammar)
+    LR = CFGtoLR.LRParsingTable(CFG, CFGtoLR.FiniteAutomata(CFG), mode)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {
+        'rules': len(grammar),
+        'states': len(LR.table),
+        'cells': sum(len(row) for row in LR.table.values()),
+        'conflicts': len(LR.conflicts),
+        'seconds': {phase: min(values) for phase, values in times.items()},
+        'peak_bytes': peak
+    }
+    if workers:
+        result['workers'] = workers
+        result['speedup'] = result['seconds']['automaton'] / result['seconds']['parallel']
+        result['identical'] = [(x.kernel, x.paths, x.complete) for x in FA.node_tree] == [(x.kernel, x.paths, x.complete) for x in parallel.node_tree]
+    return result
+
+
+
+def run(mode: str, repeat: int, seed: int, workers: int = None) -> [dict]:
+    '''Runs every sweep along with CFG.json
+
+    Returns:
+        [dict]: one result per grammar. see measure()
+    '''
+    cases = [('CFG.json', None)]
+    for param, values in SWEEPS.items():
+        for value in values:
+            cases.append((f'{param}={value}', dict(BASE_PARAMS, **{param: value})))
+
+    results = list()
+    for name, params in cases:
+        if params is None:
+            with open('CFG.json', 'r') as file:
+                grammar = json.load(file)
+        else:
+            grammar = generate_grammar(**params, seed=seed)
+        result = {'name': name, 'params': params, 'mode': mode}
+        result.update(measure(grammar, mode, repeat, workers))
+        results.append(result)
+
+        seconds = result['seconds']
+        print(f'{name:<18} {result["rules"]:>6} {result["states"]:>7} {result["cells"]:>8} '
+              f'{seconds["grammar"]*1000:>10.2f} {seconds["automaton"]*1000:>10.2f} {seconds["table"]*1000:>10.2f} {result["peak_bytes"]/1024:>10.0f}', end='')
+        if workers:
+            print(f' {seconds["parallel"]*1000:>10.2f} {result["speedup"]:>7.2f}x{"" if result["identical"] else " DIFFERENT"}', end='')
+        print()
+    return results
+
+
+
+def compare(results: [dict], baseline: [dict], threshold: float) -> [str]:
+    '''Finds every phase that got slower than the baseline by more than the threshold
+
+    Args:
+        results ([dict]): from run()
+        baseline ([dict]): from an earlier run()
+        threshold (float): ex: 1.25 allows a phase to take 25% longer
+
+    Returns:
+        [str]: a description of each regression
+    '''
+    old = {(x['name'], x['mode']): x for x in baseline}
+    regressions = list()
+    for result in results:
+        previous = old.get((result['name'], result['mode']))
+        if result.get('identical') is False:
+            regressions.append(f'{result["name"]}: the FA generated with {result["workers"]} processes is different')
+        if not previous:
+            continue
+        if result['states'] != previous['states']:
+            regressions.append(f'{result["name"]}: {previous["states"]} states before, {result["states"]} now')
+        for phase, seconds in result['seconds'].items():
+            if phase in previous['seconds'] and seconds > previous['seconds'][phase] * threshold:
+                regressions.append(f'{result["name"]}: {phase} took {seconds/previous["seconds"][phase]:.2f}x as long')
+    return regressions
+
+
+
+if __name__ in '__main__':
+    parser = argparse.ArgumentParser(description='times each phase of the CFGtoLR table builder on generated grammars')
+    parser.add_argument('--mode', choices=CFGtoLR.MODES, default='SLR')
+    parser.add_argument('--repeat', type=int, default=3, help='take the fastest of this many runs (default: 3)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the results (default: benchmark_results.json)')
+    parser.add_argument('--baseline', help='results of an earlier run to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='how many times slower a phase may get before it counts as a regression (default: 1.25)')
+    parser.add_argument('--workers', type=int, help='also time the FA generated with this many processes and compare it to the serial one')
+    args = parser.parse_args()
+
+    print(f'{"grammar":<18} {"rules":>6} {"states":>7} {"cells":>8} {"FIRST (ms)":>10} {"FA (ms)":>10} {"table (ms)":>10} {"peak (KB)":>10}', end='')
+    print(f' {"FA/N (ms)":>10} {"speedup":>8}' if args.workers else '')
+    results = run(args.mode, args.repeat, args.seed, args.workers)
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=4)
+    print(f'results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for line in regressions:
+            print('REGRESSION', line)
+        if regressions:
+            raise SystemExit(1)
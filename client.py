@@ -0,0 +1,126 @@
+# standard libraries
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# local modules
+import daemon
+
+
+
+# global variables
+START_TIMEOUT = 30  # how many seconds to wait for a daemon that was just started to start listening
+
+
+
+def connect(path: str, start: bool = True) -> socket.socket:
+    '''Connects to a daemon, starting one in the background if none is listening
+
+    A daemon that's started here runs in the folder of this file, so it finds CFG.json and its cache wherever the client is run from.
+    Anything it writes to stderr goes to <path>.log
+
+    Args:
+        path (str): the daemon's socket. see daemon.SOCKET
+        start (bool): whether to start a daemon if none is listening
+
+    Returns:
+        socket.socket
+
+    Raises:
+        ConnectionError: if the daemon that was started exits before it starts listening
+    '''
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+        return client
+    except (FileNotFoundError, ConnectionRefusedError):
+        if not start:
+            raise
+
+    print('starting compiler daemon...', end=' ')
+    here = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.abspath(path) # the daemon runs in another folder
+    with open(path + '.log', 'w') as log: # the daemon must not hold on to the caller's stderr, or a pipe reading it never closes
+        process = subprocess.Popen([sys.executable, os.path.join(here, 'daemon.py'), '--socket', path],
+                                   cwd=here, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=log, start_new_session=True)
+    deadline = time.monotonic() + START_TIMEOUT
+    while True:
+        try:
+            client.connect(path)
+            print('ok')
+            return client
+        except (FileNotFoundError, ConnectionRefusedError):
+            if process.poll() is not None:
+                print('failed')
+                raise ConnectionError(f'the daemon exited with code {process.returncode}. see {path}.log')
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+
+def request(client: socket.socket, message: dict) -> dict:
+    '''Sends one request to a daemon and waits for its response
+
+    Args:
+        client (socket.socket)
+        message (dict): see daemon.Daemon
+
+    Returns:
+        dict
+    '''
+    client.sendall((json.dumps(message) + '\n').encode('utf8'))
+    response = b''
+    while not response.endswith(b'\n'):
+        data = client.recv(65536)
+        if not data:
+            raise ConnectionError('the daemon closed the connection')
+        response += data
+    return json.loads(response)
+
+
+
+if __name__ in '__main__':
+    parser = argparse.ArgumentParser(description='compiles and runs a program with the compiler daemon, starting it if needed. see daemon.py')
+    parser.add_argument('source', nargs='?', default='finalp1.txt', help='the program to compile (default: finalp1.txt)')
+    parser.add_argument('--tokens', default='finalp2.txt', help='the file to write the cleaned up program to (default: finalp2.txt)')
+    parser.add_argument('--output', help='the python file to generate (default: the program\'s name)')
+    parser.add_argument('--compile-only', action='store_true', help='don\'t run the program')
+    parser.add_argument('--stats', action='store_true', help='print the daemon\'s latency and throughput counters instead')
+    parser.add_argument('--shutdown', action='store_true', help='stop the daemon instead')
+    parser.add_argument('--socket', default=daemon.SOCKET, help=f'the daemon\'s socket (default: {daemon.SOCKET})')
+    args = parser.parse_args()
+
+    try:
+        if args.stats or args.shutdown:
+            with connect(args.socket, start=False) as client:
+                response = request(client, {'command': 'stats' if args.stats else 'shutdown'})
+            if args.stats:
+                print(json.dumps(response, indent=4))
+            raise SystemExit(0)
+
+        message = {
+            'command': 'compile' if args.compile_only else 'run',
+            'path': os.path.abspath(args.source), # the daemon may have been started from another folder
+            'tokens': os.path.abspath(args.tokens),
+            'folder': os.getcwd()
+        }
+        if args.output:
+            message['output'] = os.path.abspath(args.output)
+        with connect(args.socket) as client:
+            response = request(client, message)
+    except OSError as error: # includes ConnectionError
+        print(f'ERROR: {error}')
+        raise SystemExit(1)
+
+    if 'error' in response:
+        print(f'ERROR: {response["error"]}')
+        raise SystemExit(1)
+    print(response['log'], end='')
+    print(response.get('stdout', ''), end='')
+    if not response['ok']:
+        raise SystemExit(1)
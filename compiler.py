@@ -1,223 +1,678 @@
+# standard libraries
+import contextlib
+import io
+import os
+
 # local modules
 import CFGtoLR
-import translator
+import normalizer
+import syntax_tree
+
+
+
+# global variables
+MAX_ERRORS = 20 # test() stops after reporting this many errors
+RECOVERY_NONTERMINALS = ('<stat>', '<dec-list>')    # after a syntax error, parsing picks up again as if one of these had just been read
+RECOVERY_TERMINALS = ('begin', 'end.', 'write')     # after a syntax error, words are skipped until one of these or until after a ;
+STATEFUL_NONTERMINALS = ('<prog>', '<dec-list>')    # their semantic actions fill in the Compiler's attributes, so test_incremental() never reuses them
+
 
 
 class Compiler:
-    def __init__(self, CFG: [[str, [str]]], words: [str]):
+    def __init__(self, CFG: [[str, [str]]], words: [str], packed: bool = False, parser=None, lazy: bool = False, normalize: bool = False, max_errors: int = MAX_ERRORS, incremental: bool = False):
         '''A class that checks the legality of the custom coding language and compiles it into python
 
         Args:
+            CFG ([[str, [str]]]): the CFG formatted in a very specific way. it is never changed
             words ([str]): a cleaned up list of words from the source code. should be obtained from translator.translate()
+            packed (bool): parse with a memory mapped CFGtoLR.PackedTable from the cache instead of a CFGtoLR.DenseTable
+            parser (module): a parser module generated by parsergen.py from the same CFG. if given, no table is loaded
+            lazy (bool): parse with a CFGtoLR.LazyTable, which only generates the rows the program actually reaches
+            normalize (bool): build the tables from normalizer.normalize(RULES) instead of RULES, which gives smaller tables and fewer reductions
+            max_errors (int): test() stops after reporting this many errors
+            incremental (bool): remember each parse so the next program only has the words that changed re-parsed. see test_incremental()
 
         Attributes:
             words ([str]): see args
             RULES ([str, [str]]): the CFG with lambdas removed
-            LR_TABLE ({str: {str: str}}): the LR parsing table derived from the given grammar
-            variables ([str]): the variables the program declares. used to check if the code tries to assign values to an undeclared variable
+            LR_TABLE ({str: {str: str}}): the LR parsing table derived from the given grammar. None for some kinds of TABLE. see load_table()
+            LR_RULES ([[str, int]]): the left side and right side length of each rule # in LR_TABLE
+            ORIGIN ([[int]]): the RULES rule #s that each rule # in LR_TABLE stands for. see normalizer.normalize()
+            ACTIONS ([function]): the semantic action of each rule # in RULES. see load_actions()
+            USES ([(int,)]): the positions of the <identifier>s that each rule # in RULES uses. see load_actions()
+            REUSABLE ([bool]): whether test_incremental() can reuse the value of each rule # in LR_TABLE from the last parse. see load_actions()
+            TABLE (CFGtoLR.DenseTable or CFGtoLR.PackedTable): LR_TABLE encoded as integers. this is what test() actually parses with
+            program_name (str): the name after program
+            tree (syntax_tree.Program): the syntax tree built by the semantic actions while parsing
+            variables ({str: int}): the symbol table. maps each variable the program declares to the index of the word it was declared at
+            errors (int): how many errors test() found
+            check_names (bool): whether undeclared variables are reported. turned off when the declarations had a syntax error
+            symbols ([int]): the terminal column # of each word. see encode_words()
+            resume (int): the index of the word that the last recover() picked up from
+            last_parse (dict): what test_incremental() saved about the last program it parsed. None if there isn't one
         '''
-        self.words = words
         self.RULES = CFG
-        self.LR_TABLE = CFGtoLR.convert(CFG)
-        self.TERMINALS = CFGtoLR.terminals(CFG)
-        self.variables = []
+        self.packed = packed
+        self.parser = parser
+        self.lazy = lazy
+        self.normalize = normalize
+        self.max_errors = max_errors
+        self.incremental = incremental
+        self.last_parse = None
+        self.load_table()
+        self.load_actions()
+        self.reset(words)
+
+
+
+    def reset(self, words: [str]):
+        '''Forgets the current program and gets ready to compile another one with the same tables
+
+        Loading the tables is the slowest part of creating a Compiler, so compiling many programs with one Compiler is much faster.
+        last_parse is kept, so an incremental Compiler only re-parses the part of the new program that's different.
+
+        Args:
+            words ([str]): see __init__()
+        '''
+        self.words = words
+        self.program_name = None
+        self.tree = None
+        self.variables = dict()
+        self.errors = 0
+        self.check_names = True
+        self.symbols = []
+        self.resume = None
+
+
+
+    def load_table(self):
+        '''Loads LR_TABLE, LR_RULES, TERMINALS, ORIGIN and TABLE for RULES, reusing a cached table if there is one
+
+        LR_TABLE is None if the table comes from a parser module, is lazy or is packed, since none of those are ever decoded into strings.
+        A packed table is opened straight from the cache, so the JSON cache file is only read if the packed file has to be created.
+        '''
+        grammar = self.RULES
+        self.ORIGIN = [[x] for x in range(len(CFGtoLR.split_declarations(grammar)[0])+1)]
+        if self.normalize and not self.parser:
+            grammar, self.ORIGIN = normalizer.normalize(grammar)
+
+        if self.parser:
+            self.LR_TABLE = None
+            self.LR_RULES = self.parser.rules
+            self.TERMINALS = self.parser.terminals
+            self.TABLE = self.parser
+            return
+
+        if self.lazy:
+            CFG = CFGtoLR.Grammar(grammar)
+            self.LR_TABLE = None
+            self.LR_RULES = CFG.rule_metadata()
+            self.TERMINALS = CFG.terminals
+            self.TABLE = CFGtoLR.LazyTable(CFG)
+            return
+
+        if self.packed:
+            self.TABLE = CFGtoLR.load_packed(grammar)
+            self.LR_TABLE = None
+            self.LR_RULES = self.TABLE.rule_metadata()
+            self.TERMINALS = self.TABLE.terminals
+            return
+
+        lr = CFGtoLR.load(grammar)
+        self.LR_TABLE = lr['table']
+        self.LR_RULES = lr['rules']
+        self.TERMINALS = lr['terminals']
+        self.TABLE = CFGtoLR.DenseTable(self.LR_TABLE, self.TERMINALS, self.LR_RULES)
+
+
+
+    def load_actions(self):
+        '''Finds the semantic action of each rule # in RULES, along with the <identifier>s it uses
+
+        The action of a rule is picked by its left side. see reduce()
+        <dec-list> declares the <identifier>s of its <dec>s and <prog> names the program with its <identifier>.
+        Every other rule (besides <identifier> itself) uses its <identifier>s, which have to be declared.
+        A rule # in LR_TABLE is reusable unless it stands for a rule of STATEFUL_NONTERMINALS.
+        '''
+        actions = {
+            '<prog>': self.reduce_prog,
+            '<identifier>': self.reduce_identifier,
+            '<dec-list>': self.reduce_dec_list,
+            '<dec>': self.reduce_dec,
+            '<stat-list>': self.reduce_stat_list,
+            '<write>': self.reduce_write,
+            '<str>': self.reduce_terminal,
+            '<assign>': self.reduce_assign,
+            '<expr>': self.reduce_expr,
+            '<number>': self.reduce_number,
+            '<sign>': self.reduce_terminal
+        }
+        self.ACTIONS = [None] # START --> <prog>
+        self.USES = [()]
+        for left, right in CFGtoLR.split_declarations(self.RULES)[0]:
+            self.ACTIONS.append(actions.get(left))
+            if left in ('<prog>', '<dec>', '<identifier>'):
+                self.USES.append(())
+            else:
+                self.USES.append(tuple(index for index, symbol in enumerate(right) if symbol == '<identifier>'))
+
+        rules = CFGtoLR.split_declarations(self.RULES)[0]
+        stateful = {index+1 for index, (left, _) in enumerate(rules) if left in STATEFUL_NONTERMINALS}
+        self.REUSABLE = [not stateful.intersection(origin) for origin in self.ORIGIN]
+
+
+
+    def encode_words(self, words: [str] = None) -> [int]:
+        '''Converts the words into the terminal column #s of TABLE so test() never has to look up a string
+
+        Each word is one input symbol. A translator.Token is looked up by its kind, so every variable name is IDENT and every number is NUMBER.
+        Words the grammar doesn't know are given TABLE.unknown, which makes test() fail on them.
+
+        Args:
+            words ([str]): the words to encode. defaults to all of them
+
+        Returns:
+            [int]: the terminal column # of each word
+        '''
+        terminal_ids = self.TABLE.terminal_ids
+        unknown = self.TABLE.unknown
+        return [terminal_ids.get(getattr(word, 'kind', word), unknown) for word in (self.words if words is None else words)]
 
 
 
     def test(self) -> bool:
-        '''Checks for errors in the code by using the LR parsing table method
+        '''Checks for syntax errors and undeclared variables in one pass over the code by using the LR parsing table method
+
+        The input is read by index and the stack only holds state #s, so each step takes constant time and nothing is copied.
+        Alongside each state # is the value of its symbol, which reduce() uses to build the syntax tree and fill in the symbol table.
+        A syntax error doesn't stop the parse. see recover()
+        An incremental Compiler tries test_incremental() first, and only parses the whole program again to report the errors it found.
 
         Returns:
             bool: True if there are no errors. False otherwise.
         '''
         print('testing input against LR Parsing Table...', end=' ')
 
-        stack = ['0'] # push 0
-        input_list = self.words
-        word_index = 0
-        index_cooldown = 0
-        in_vars = False
-
-        try:
-            while True:
-                # abstract variables
-                read_value = input_list[0]                  # read input string
-                state = stack[-1]                           # read stack
-
-                if read_value == 'program':
-                    in_program_name = True
-                    # in_vars = True
-
-                if read_value == 'var':
-                    in_program_name = False
-                    in_vars = True
-
-                if read_value == 'begin':   # used for determining which variables have been declared
-                    in_vars = False
-
-                if in_program_name:
-                    # pass
-                    self.variables.append(read_value)
-
-                if read_value in self.variables:
-                    in_vars = True
-
-                if in_vars:
-                    self.variables.append(read_value)
-                    if read_value not in self.TERMINALS:        # if the word is not a terminal, try it as a variable name
-                        index_cooldown += len(read_value)
-                        input_list = list(read_value) + input_list[1:]   # splits up the word into each of its characters and pushes it to the front of the words list
-                        read_value = input_list[0]
-
-                table_value = self.LR_TABLE[state][read_value]   # find [k, X] or [k, t]
-
-                stack = stack[:-1]                               # pop stack
-
-                # logic
-                if table_value.isdigit(): # boxes with number entries
-                    stack.append(state)             # push k
-                    stack.append(read_value)        # push X
-                    stack.append(table_value)       # push n
-
-                elif table_value[0] == 'S': # boxes with Sn
-                    stack.append(state)             # push k
-                    stack.append(read_value)        # push t
-                    stack.append(table_value[1:])   # push n
-                    input_list = input_list[1:]     # pop input string
-                    if index_cooldown > 0:
-                        index_cooldown -= 1
-                    if index_cooldown == 0:
-                        word_index += 1
-
-
-                elif table_value[0] == 'R': # boxes with Rn
-                    stack.append(state)             # push k
-
-                    # abstract variables
-                    rule_value = self.RULES[int(table_value[1:])-1]
-                    rule_left = rule_value[0]
-                    rule_right = rule_value[1]
-
-                    stack = stack[:-len(rule_right)*2] # pop twice the length of rule #n's right side
-                    state_new = stack[-1]           # read stack
-                    stack = stack[:-1]              # pop stack
-                    stack.append(state_new)         # push m
-                    stack.append(rule_left)         # push A
-                    stack.append(self.LR_TABLE[state_new][rule_left]) # push [m, A]
-
-                elif table_value == 'ACC': # accept state
-                    break
-
+        if self.incremental:
+            with contextlib.redirect_stdout(io.StringIO()): # any errors are reported by the full parse below
+                parsed = self.test_incremental()
+            if parsed:
+                print('ok')
+                return True
+            self.last_parse = None
+
+        action_at = self.TABLE.action_at
+        goto_at = self.TABLE.goto_at
+        rule_left = self.TABLE.rule_left
+        rule_length = self.TABLE.rule_length
+
+        self.program_name = None
+        self.tree = None
+        self.variables = dict()
+        self.errors = 0
+        self.check_names = True
+        self.resume = None
+        input_list = self.symbols = self.encode_words()
+
+        if self.parser: # the generated parser has its own driver
+            index, state = self.parser.parse(input_list, self.reduce, self.recover)
+            if index != -1 or self.errors:
+                return False
             print('ok')
             return True
-        except KeyError:
-            '''print an error message that tells you what line the mistake was found on, what the expected value is, and what was gotten instead
-            '''
-            # this section is able to find the line that the error occurred on so it can be printed for more detailed error messages
-            print(self.variables)
-            print(self.LR_TABLE[state])
-
-            with open('finalp1.txt', 'r', encoding='utf-8') as file:
-                raw_lines = [x for x in file]
-
-            lines = translator.translate_lines('finalp1.txt')
-            search = self.words[word_index-1:word_index+2]
-            line_num = int()
-            for k, v in lines.items():
-                if search[1] in v:
-                    index = v.index(search[1])
-                    if len(v) == 1:
-                        line_num = k
-                        break
-                    if index == 0 and v[1] == search[2]:
-                        line_num = k
-                        break
-                    if index == len(v)-1 and v[len(v)-2] == search[0]:
-                        line_num = k
-                        break
-                    if v[index-1] == search[0] and v[index+1] == search[2]:
-                        line_num = k
-                        break
-
-            row = stack[-1]
-            col = self.LR_TABLE[row].keys()
-            acceptable_inputs = [x for x in col if x[0] != "<"]
-            print(f'\n\nERROR on line {line_num+1}:\n{raw_lines[line_num]}REASON: expected one of {acceptable_inputs}, but got "{self.words[word_index]}" instead.')
+
+        stack = [0] # push 0
+        values = []
+        index = 0
+        reduce = self.reduce
+        while True:
+            # abstract variables
+            state = stack[-1]                                   # read stack
+            table_value = action_at(state, input_list[index])   # find [k, t]
+
+            # logic
+            if table_value > 0: # boxes with Sn
+                stack.append(table_value-1)     # push n
+                values.append(index)
+                index += 1                      # pop input string
+
+            elif table_value == CFGtoLR.ACCEPT: # accept state
+                break
+
+            elif table_value != CFGtoLR.ERROR: # boxes with Rn
+                rule = -table_value-1
+                length = rule_length[rule]
+                if length:
+                    children = values[-length:]
+                    del stack[-length:]         # pop the length of rule #n's right side
+                    del values[-length:]
+                else:
+                    children = []
+                stack.append(goto_at(stack[-1], rule_left[rule])) # push [m, A]
+                values.append(reduce(rule, children))
+
+            else: # empty boxes
+                index = self.recover(index, stack, values)
+                if index is None:
+                    return False
+
+        if self.errors:
             return False
+        print('ok')
+        return True
+
 
 
+    def test_incremental(self) -> bool:
+        '''Parses the program by picking up from where the last parse was just before the first word that changed
 
-    def test_vars(self):
-        '''Checks for errors with undeclared variable names by changing the CFG and reloading the LR_TABLE and TERMINALS
+        The stack is a linked list of (state #, value, index of its first word, the node below it) that is never changed,
+        so the snapshot of it saved before every word (along with the symbol table) costs nothing.
+        Every value a reduction makes is saved as well, with how many words it took up, the state # below it, its left side and the symbol table it was checked against.
 
-        The normal LR table (produced from the handout) is unable to determine if variables in <stat-list> were declared in <dec-list> or not.
-        As a solution, after we've tested the input once and collected the declared variables, we change the CFG and LR table.
-        The CFG is changed such that all <identifier> productions are replaced with <identifier> --> variable.
-        This means that the variables are now terminals and the LR table generated from the new CFG will now be able to determine if variables
-        in <dec-list> were declared in <stat-list> or not.
+        The next time:
+            1. the words are compared with the last program's. see diff_words()
+            2. parsing picks up from the snapshot just before the first changed word (or the closest one before it),
+                with the symbol table as it was then. that's the last program's symbol table if the var section didn't change
+            3. after the changed words, a saved value replaces parsing its words again if it's on top of the same state # with the same variables.
+                it only depends on words that didn't change, so parsing them would make the same thing
+        Since <stat-list> is left recursive, everything before the change is one value on the stack and every <stat> after it is reused in one step,
+        so a small change only has its own words parsed, plus one step and one reduction for every statement after it.
 
-        Additionally, we slightly change <prog> production to <prog> --> program <program-name> ; ...
-        because otherwise this would falsely allow the program name in the <stat-list> section even though it was never declared in
-        the <dec-list> section.
+        A reused value's snapshot is saved after it, but it already depended on the next word, so it's only used when that word didn't change.
+        Reused values keep the word indexes of the program they came from, which only matter for error messages, and those come from test().
+
+        Returns:
+            bool: True if the program parsed without any errors
         '''
-        print('testing variable names...')
-        print('constructing new CFG...', end=' ')
+        action_at = self.TABLE.action_at
+        goto_at = self.TABLE.goto_at
+        rule_left = self.TABLE.rule_left
+        rule_length = self.TABLE.rule_length
+        reusable = self.REUSABLE
+        reduce = self.reduce
+        words = self.words
+
+        self.program_name = None
+        self.tree = None
+        self.errors = 0
+        self.check_names = True
+        self.resume = None
+
+        last = self.last_parse
+        if last is None:
+            old = []
+            start, end = 0, 0
+            last = {'symbols': [], 'snapshots': [((0, None, 0, None), dict(), False)], 'subtrees': []}
+        else:
+            old = last['words']
+            start, end = self.diff_words(old, words)
+            if start == len(words) == len(old): # nothing changed
+                self.tree = last['tree']
+                self.program_name = self.tree.name.name
+                self.variables = last['variables']
+                self.symbols = last['symbols']
+                last['words'] = words
+                return True
+
+        changed = len(words) - end # the words from start to changed are new
+        self.symbols = symbols = last['symbols'][:start] + self.encode_words(words[start:changed]) + last['symbols'][len(old)-end:]
+        snapshots = last['snapshots'][:start+1] + [None] * (len(words)-start-1)
+        subtrees = last['subtrees'][:start] + [None] * (changed-start) + last['subtrees'][len(old)-end:]
+
+        index = start
+        while snapshots[index] is None or (index == start and snapshots[index][2]): # no snapshot, or one that depended on a changed word
+            index -= 1
+        node, self.variables, _ = snapshots[index]
+        below = node
+        while below: # any value that started under the snapshot and ended after it took up a changed word
+            subtrees[below[2]] = None
+            below = below[3]
+
+        compared = (None, None, False) # the last two symbol tables compared, and whether they have the same variables
+        while True:
+            state = node[0]
+            if index >= changed:
+                saved = subtrees[index]
+                if saved and saved[1] == state:
+                    if saved[4] is not compared[0] or self.variables is not compared[1]:
+                        compared = (saved[4], self.variables, saved[4].keys() == self.variables.keys())
+                    if compared[2]:
+                        node = (goto_at(state, saved[2]), saved[3], index, node)
+                        index += saved[0]
+                        snapshots[index] = (node, self.variables, True)
+                        continue
+
+            table_value = action_at(state, symbols[index])
+            if table_value > 0: # boxes with Sn
+                subtrees[index] = None # whatever was saved here is being parsed again
+                node = (table_value-1, index, index, node)
+                index += 1
+                snapshots[index] = (node, self.variables, False)
+
+            elif table_value == CFGtoLR.ACCEPT: # accept state
+                break
+
+            elif table_value != CFGtoLR.ERROR: # boxes with Rn
+                rule = -table_value-1
+                length = rule_length[rule]
+                children = [None] * length
+                first = index
+                below = node
+                for position in range(length-1, -1, -1):
+                    children[position] = below[1]
+                    first = below[2]
+                    below = below[3]
+                column = rule_left[rule]
+                value = reduce(rule, children)
+                node = (goto_at(below[0], column), value, first, below)
+                if length and reusable[rule]:
+                    subtrees[first] = (index-first, below[0], column, value, self.variables)
+
+            else: # empty boxes. test() parses it again to recover and report every error
+                return False
+
+        if self.errors:
+            return False
+        self.last_parse = {
+            'words': words,
+            'symbols': symbols,
+            'snapshots': snapshots,
+            'subtrees': subtrees,
+            'tree': self.tree,
+            'variables': self.variables
+        }
+        return True
 
-        # replace <identifier> in <prog> with <program-name>
-        start_index = self.RULES.index([x for x in self.RULES if x[0] == '<prog>'][0])
-        ident_index = self.RULES[start_index][1].index('<identifier>')
-        self.RULES[start_index][1].pop(ident_index)
-        self.RULES[start_index][1].insert(ident_index, '<program-name>')
-        self.RULES.append(['<program-name>', [self.variables[0]]]) # add <program-name> --> program_name_variable
 
-        for line in [x for x in self.RULES if x[0] == '<identifier>']: # remove old <identifier> productions
-            self.RULES.remove(line)
 
-        self.RULES += [['<identifier>' , [x]] for x in self.variables[1:]] # add in the new identifiers with variables
-        print('ok')
+    def diff_words(self, old: [str], new: [str]) -> (int, int):
+        '''Finds the part of a program that changed
+
+        Words are compared in slices that get smaller, so the parts that didn't change are skipped over without a loop per word.
+
+        Args:
+            old ([str]): the last program's words
+            new ([str]): the new program's words
+
+        Returns:
+            (int, int): how many words at the start and at the end are the same. they never overlap
+        '''
+        limit = min(len(old), len(new))
+        start = 0
+        step = 1024
+        while step:
+            while start+step <= limit and old[start:start+step] == new[start:start+step]:
+                start += step
+            step //= 2
+
+        limit -= start
+        end = 0
+        step = 1024
+        while step:
+            while end+step <= limit and old[len(old)-end-step:len(old)-end] == new[len(new)-end-step:len(new)-end]:
+                end += step
+            step //= 2
+        return start, end
+
+
+
+    def reduce(self, rule: int, children: list):
+        '''Runs the semantic actions of a rule # in LR_TABLE
+
+        A rule # of a normalized CFG can stand for several rules of RULES (see ORIGIN), so their actions are run
+        starting from the innermost one, the same as if the parser had reduced by each of them.
+
+        Args:
+            rule (int)
+            children (list): the value of each symbol on the rule's right side. a terminal's value is the index of its word
+
+        Returns:
+            the value of the rule's left side. a rule without an action takes the value of its first symbol
+        '''
+        if None in children: # part of the code was skipped by recover()
+            return None
+
+        origin = self.ORIGIN[rule]
+        for original in reversed(origin):
+            for position in self.USES[original]:
+                name = children[position]
+                if self.check_names and name.name not in self.variables:
+                    self.errors += 1
+                    self.report_error(name.index, f'"{name.name}" was never declared.')
+
+            action = self.ACTIONS[original]
+            if action:
+                value = action(children)
+            else:
+                value = children[0] if children else None
+            children = [value]
+        return value
+
+
+
+    def reduce_terminal(self, children: list) -> str:
+        # <str> --> "value=" ,
+        # <sign> --> +
+        return self.words[children[0]]
+
 
-        print('generating new LR Parsing Table...')
-        self.LR_TABLE = CFGtoLR.convert(self.RULES) # get new LR table
-        self.TERMINALS = CFGtoLR.terminals(self.RULES) # get the new terminals
-        return self.test()
 
+    def reduce_identifier(self, children: list) -> syntax_tree.Name:
+        # <identifier> --> IDENT
+        return syntax_tree.Name(self.words[children[0]], children[0])
 
 
-    def compile(self) -> str:
+
+    def reduce_number(self, children: list) -> syntax_tree.Number:
+        # <number> --> <sign> NUMBER
+        # <number> --> NUMBER
+        if len(children) == 2:
+            return syntax_tree.Number(children[0] + self.words[children[1]])
+        return syntax_tree.Number(self.words[children[0]])
+
+
+
+    def reduce_expr(self, children: list):
+        # <expr> --> <expr> + <expr>
+        # <expr> --> ( <expr> )
+        # <expr> --> <identifier>
+        if len(children) == 1:
+            return children[0]
+        if isinstance(children[0], int): # ( <expr> )
+            return children[1]
+        return syntax_tree.BinaryOp(self.words[children[1]], children[0], children[2])
+
+
+
+    def reduce_assign(self, children: list) -> syntax_tree.Assign:
+        # <assign> --> <identifier> = <expr> ;
+        return syntax_tree.Assign(children[0], children[2])
+
+
+
+    def reduce_write(self, children: list) -> syntax_tree.Write:
+        # <write> --> write ( <str> <identifier> ) ;
+        # <write> --> write ( <identifier> ) ;
+        if len(children) == 6:
+            return syntax_tree.Write(children[2], children[3])
+        return syntax_tree.Write(None, children[2])
+
+
+
+    def reduce_stat_list(self, children: list) -> tuple:
+        # <stat-list> --> <stat-list> <stat>
+        # <stat-list> --> <stat>
+        # the list is left recursive so the stack doesn't grow with every statement, which makes the last statement the first link.
+        # statements are linked to the list instead of appended to it, so a value is never changed after it's made.
+        # test_incremental() depends on that, since it reuses values from the last parse. see unlink()
+        if len(children) == 2:
+            return (children[1], children[0])
+        return (children[0], None)
+
+
+
+    def reduce_dec(self, children: list) -> tuple:
+        # <dec> --> <identifier> , <dec>
+        # <dec> --> <identifier>
+        # linked the same way as reduce_stat_list()
+        if len(children) == 3:
+            return (children[0], children[2])
+        return (children[0], None)
+
+
+
+    def reduce_dec_list(self, children: list) -> [syntax_tree.Name]:
+        # <dec-list> --> <dec> : <type> ;
+        # the symbol table is replaced instead of filled in, so a snapshot of the old one never changes. see test_incremental()
+        names = self.unlink(children[0])
+        variables = dict()
+        for name in names:
+            variables.setdefault(name.name, name.index)
+        self.variables = variables
+        return names
+
+
+
+    def reduce_prog(self, children: list) -> syntax_tree.Program:
+        # <prog> --> program <identifier> ; var <dec-list> begin <stat-list> end.
+        self.program_name = children[1].name
+        self.tree = syntax_tree.Program(children[1], children[4], self.unlink(children[6])[::-1])
+        return self.tree
+
+
+
+    def unlink(self, linked: tuple) -> list:
+        '''Turns the linked values of reduce_stat_list() and reduce_dec() into a list
+
+        Args:
+            linked (tuple): (first item, the rest of the items) where the last rest is None
+
+        Returns:
+            list: the items in order
+        '''
+        items = []
+        while linked:
+            items.append(linked[0])
+            linked = linked[1]
+        return items
+
+
+
+    def recover(self, index: int, stack: [int], values: list) -> int:
+        '''Reports a syntax error and gets the parser ready to keep going, so one parse finds every syntax error
+
+        Panic mode recovery:
+            1. skip words until the next RECOVERY_TERMINALS or until after the next ;
+            2. pop the stack until a state that has a goto for one of RECOVERY_NONTERMINALS, and the word after the skipped ones can follow
+            3. push that goto, as if the skipped words had been a whole <stat> (or <dec-list>)
+        Every word is skipped at most once and every state is popped at most once, so this keeps the parse linear.
+
+        Args:
+            index (int): the index of the word that had no entry in the LR parsing table
+            stack ([int]): the parser's state #s. changed in place
+            values (list): the values alongside the state #s. changed in place. the skipped part gets None. see reduce()
+
+        Returns:
+            int: the index of the word to keep parsing from. None if the parser should stop
+        '''
+        self.report_syntax_error(stack[-1], index)
+        if self.errors >= self.max_errors:
+            print(f'\n\nstopped after {self.errors} errors')
+            return None
+
+        terminal_ids = self.TABLE.terminal_ids
+        stops = {terminal_ids[x] for x in RECOVERY_TERMINALS if x in terminal_ids}
+        semicolon = terminal_ids.get(';')
+        end = len(self.symbols) - 1 # $
+
+        if index == self.resume: # nothing was read since the last recovery, so skip the word it stopped at
+            index += 1
+        while index < end and self.symbols[index] not in stops and self.symbols[index] != semicolon:
+            index += 1
+        if index < end and self.symbols[index] == semicolon:
+            index += 1
+        if index > end:
+            return None
+
+        lookahead = self.symbols[index]
+        columns = [(x, self.TABLE.nonterminal_ids[x]) for x in RECOVERY_NONTERMINALS if x in self.TABLE.nonterminal_ids]
+        while True:
+            for name, column in columns:
+                if not self.TABLE.has_goto(stack[-1], column):
+                    continue
+                target = self.TABLE.goto_at(stack[-1], column)
+                if self.TABLE.has_action(target, lookahead): # action_at() can't tell, a packed table fills empty cells with defaults
+                    if name == '<dec-list>': # some declarations might be missing, so uses of them can't be checked
+                        self.check_names = False
+                    stack.append(target)
+                    values.append(None)
+                    self.resume = index
+                    return index
+            if len(stack) == 1:
+                return None
+            stack.pop()
+            values.pop()
+
+
+
+    def report_syntax_error(self, state: int, word_index: int):
+        '''print an error message for a word that has no entry in the LR parsing table
+
+        Args:
+            state (int): the row of TABLE that had no entry for the word
+            word_index (int): the index of the word that caused the error
+        '''
+        self.errors += 1
+        acceptable_inputs = self.TABLE.expected(state)
+        self.report_error(word_index, f'expected one of {acceptable_inputs}, but got "{self.words[word_index]}" instead.')
+
+
+
+    def report_error(self, word_index: int, reason: str):
+        '''print an error message that tells you what line the mistake was found on and what the mistake was
+
+        The line and column come from the word itself (see translator.Token) and the line is rebuilt from the words around it,
+        so the source file is never read again. The end marker $ that translator.translate() adds is never part of the line.
+
+        Args:
+            word_index (int): the index of the word that caused the error
+            reason (str)
+        '''
+        word = self.words[word_index]
+        line = getattr(word, 'line', None)
+        if line is None: # not a translator.Token, so there's no position to report
+            print(f'\n\nERROR at "{word}":\nREASON: {reason}')
+            return
+
+        start = word_index
+        while start > 0 and getattr(self.words[start-1], 'line', None) == line:
+            start -= 1
+        last = len(self.words) - 1 # the end marker
+        end = min(word_index + 1, last)
+        while end < last and getattr(self.words[end], 'line', None) == line:
+            end += 1
+
+        print(f'\n\nERROR on line {line}, column {word.column}:\n{" ".join(self.words[start:end])}\nREASON: {reason}')
+
+
+
+    def compile(self, filename: str = None, folder: str = '') -> str:
         '''Checks for errors in the code and if it's good, then compiles the code into python
 
+        Args:
+            filename (str): where to write the code. defaults to the program name followed by .py
+            folder (str): the folder to write the default filename to. defaults to the current folder
+
         Returns:
             str: the code's filename. returns None if a file was not created
         '''
-        if self.test() and self.test_vars():
+        if self.test():
             print('generating python file...', end=' ')
 
-            # collect information
-            filename = self.words[self.words.index('program')+1] + '.py'
-            var_list = [x + ' = int()\n' for x in self.words[self.words.index('var')+1 : self.words.index('begin')-3] if x != ',']
-            instructions = ' '.join(self.words[self.words.index('begin')+1 : self.words.index('end.')-1]).split(';')
-
-            # fix instructions
-            for index in range(len(instructions)):
-                statement = instructions[index]
-                if statement[0] == ' ':
-                    statement = statement[1:]
-                statement = statement.replace('write', 'print')
-                statement += '\n'
-                instructions[index] = statement
-
-            # create output string
-            output_string = '# declare variables\n# although not necessary for python, i thought it would be nice to mimic the input\n'
-            for var in var_list:
-                output_string += (var)
-
-            output_string += '\n# logic\n'
-            for statement in instructions:
-                output_string += statement
-
-            # write to file
+            filename = filename or os.path.join(folder, self.tree.name.python() + '.py')
             with open(filename, 'w+') as file:
-                file.write(output_string)
+                file.write(self.tree.python())
 
             print('ok')
             return filename
@@ -0,0 +1,250 @@
+# standard libraries
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+# local modules
+import compiler
+import translator
+
+
+
+# global variables
+SOCKET = '.compiler.sock'
+COMMANDS = ('compile', 'run', 'stats', 'shutdown')
+
+
+
+class Daemon:
+    def __init__(self, grammar: [[str, [str]]], options: dict):
+        '''Keeps a Compiler and its tables loaded and compiles whatever its clients ask for
+
+        The protocol is one JSON object per line in each direction. Every request has a "command" and an optional "id"
+        that is copied into its response:
+            {"command": "compile", "path": "finalp1.txt", "tokens": "finalp2.txt", "output": "f2020.py", "folder": "."}
+                tokens, output and folder are optional. see translator.translate() and Compiler.compile()
+            {"command": "run", ...}: the same as compile, then runs the program
+            {"command": "stats"}: the counters below
+            {"command": "shutdown"}
+
+        Compile and run requests are handled one at a time in a thread behind a lock, so the Compiler is never shared between two of them.
+        The event loop stays free while they run, so any number of clients can be connected and stats and shutdown are answered right away.
+        An incremental Compiler compares each program with the last one it compiled, so recompiling a file after a small edit is fast.
+
+        Args:
+            grammar ([[str, [str]]]): the CFG formatted in a very specific way
+            options (dict): the keyword arguments of the Compiler
+
+        Attributes:
+            compiler (compiler.Compiler): reused for every request. see Compiler.reset()
+            started (float): when the daemon started. see time.perf_counter()
+            requests ({str: int}): how many requests of each command were handled
+            failures (int): how many requests didn't compile or couldn't be handled
+            total_seconds (float): the time spent handling every request
+            max_seconds (float): the slowest request
+            stopped (asyncio.Event): set by the shutdown command
+            compiling (asyncio.Lock): held while a compile or run request uses the compiler
+        '''
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.compiler = compiler.Compiler(grammar, [], **options)
+        self.started = time.perf_counter()
+        self.requests = {x: 0 for x in COMMANDS}
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.stopped = None
+        self.compiling = None
+
+
+
+    def stats(self) -> dict:
+        '''Gets the latency and throughput counters
+
+        Returns:
+            dict
+        '''
+        handled = sum(self.requests.values())
+        uptime = time.perf_counter() - self.started
+        return {
+            'uptime': uptime,
+            'requests': dict(self.requests),
+            'failures': self.failures,
+            'requests_per_second': handled / uptime if uptime else 0,
+            'average_ms': self.total_seconds / handled * 1000 if handled else 0,
+            'max_ms': self.max_seconds * 1000
+        }
+
+
+
+    def compile(self, request: dict) -> dict:
+        '''Handles a compile or run request
+
+        Args:
+            request (dict)
+
+        Returns:
+            dict: whether it compiled, how many errors it had, the python file, everything the compiler printed (log)
+                and for run requests, everything the program printed (stdout)
+        '''
+        response = {'ok': False}
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            words = translator.translate(request['path'], request.get('tokens', os.devnull), self.compiler.TERMINALS)
+            self.compiler.reset(words)
+            filename = self.compiler.compile(request.get('output'), request.get('folder', ''))
+        response['ok'] = filename is not None
+        response['errors'] = self.compiler.errors
+        response['output'] = filename
+        response['log'] = log.getvalue()
+
+        if filename and request['command'] == 'run':
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                self.compiler.run(filename)
+            response['stdout'] = stdout.getvalue()
+        return response
+
+
+
+    def handle(self, request: dict) -> dict:
+        '''Handles one request and updates the counters
+
+        Args:
+            request (dict)
+
+        Returns:
+            dict: the response. ok is False and error says why if the request couldn't be handled
+        '''
+        start = time.perf_counter()
+        command = request.get('command')
+        try:
+            if command in ('compile', 'run'):
+                response = self.compile(request)
+            elif command == 'stats':
+                response = dict(self.stats(), ok=True)
+            elif command == 'shutdown':
+                response = {'ok': True}
+                if self.stopped:
+                    self.stopped.set()
+            else:
+                response = {'ok': False, 'error': f'unknown command "{command}". expected one of {COMMANDS}'}
+        except Exception as error: # a bad request shouldn't take the daemon down
+            response = {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+
+        seconds = time.perf_counter() - start
+        if command in self.requests:
+            self.requests[command] += 1
+        if not response['ok']:
+            self.failures += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+        response['ms'] = seconds * 1000
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+
+
+    async def respond(self, line: bytes) -> bytes:
+        '''Turns a line of the protocol into the line to answer it with
+
+        Compile and run requests wait for the compiler and then run in a thread, so they don't block the event loop.
+        '''
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('a request must be a JSON object')
+        except ValueError as error:
+            self.failures += 1
+            return (json.dumps({'ok': False, 'error': f'bad request: {error}'}) + '\n').encode('utf8')
+
+        if request.get('command') in ('compile', 'run'):
+            async with self.compiling:
+                response = await asyncio.get_running_loop().run_in_executor(None, self.handle, request)
+        else:
+            response = self.handle(request)
+        return (json.dumps(response) + '\n').encode('utf8')
+
+
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''Answers the requests of one client until it disconnects
+        '''
+        try:
+            while not self.stopped.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(await self.respond(line))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+
+    async def serve_socket(self, path: str):
+        '''Listens for clients on a Unix domain socket until the shutdown command
+
+        Args:
+            path (str): the socket file. an old one left behind by a daemon that crashed is replaced
+        '''
+        self.stopped = asyncio.Event()
+        self.compiling = asyncio.Lock()
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(self.serve_client, path)
+        print(f'listening on {path}')
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+
+    async def serve_stdio(self):
+        '''Answers requests from stdin on stdout until stdin closes or the shutdown command
+        '''
+        self.stopped = asyncio.Event()
+        self.compiling = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        stdout = sys.stdout.buffer
+        while not self.stopped.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                stdout.write(await self.respond(line))
+                stdout.flush()
+
+
+
+if __name__ in '__main__':
+    parser = argparse.ArgumentParser(description='keeps the compiler loaded and compiles programs for clients. see client.py')
+    parser.add_argument('--grammar', default='CFG.json', help='the CFG file (default: CFG.json)')
+    parser.add_argument('--socket', default=SOCKET, help=f'the Unix domain socket to listen on (default: {SOCKET})')
+    parser.add_argument('--stdio', action='store_true', help='read requests from stdin and answer on stdout instead of listening on a socket')
+    parser.add_argument('--packed', action='store_true', help='parse with a memory mapped table. see CFGtoLR.PackedTable')
+    parser.add_argument('--normalize', action='store_true', help='build the tables from a normalized CFG. see normalizer.normalize()')
+    parser.add_argument('--incremental', action='store_true', help='only re-parse what changed since the last program. see Compiler.test_incremental()')
+    args = parser.parse_args()
+
+    with open(args.grammar, 'r') as file:
+        CFG = json.load(file)
+    daemon = Daemon(CFG, {'packed': args.packed, 'normalize': args.normalize, 'incremental': args.incremental})
+    if args.stdio:
+        asyncio.run(daemon.serve_stdio())
+    else:
+        asyncio.run(daemon.serve_socket(args.socket))
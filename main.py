@@ -2,17 +2,27 @@
 import json
 
 # local modules
+import CFGtoLR
 import compiler
 import translator
 
+try:
+    import lr_parser # generated by parsergen.py
+except ImportError:
+    lr_parser = None
+
 
 
 if __name__ in '__main__':
     with open('CFG.json', 'r') as file:
         CFG = json.load(file)
 
-    words_list = translator.translate('finalp1.txt', 'finalp2.txt')
-    code = compiler.Compiler(CFG, words_list)
+    if lr_parser and lr_parser.GRAMMAR_HASH != CFGtoLR.grammar_hash(CFG, lr_parser.MODE):
+        print('lr_parser.py was generated from a different CFG. run parsergen.py again to use it')
+        lr_parser = None
+
+    code = compiler.Compiler(CFG, [], parser=lr_parser) # load the tables first, so the CFG is only built if the cache misses
+    code.reset(translator.translate('finalp1.txt', 'finalp2.txt', code.TERMINALS))
     file = code.compile()
     if file:
         code.run(file)
\ No newline at end of file
@@ -0,0 +1,209 @@
+# local modules
+import CFGtoLR
+
+
+
+def productive(grammar: [[str, [str]]]) -> {str}:
+    '''Finds the nonterminals that can produce a string of only terminals
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+
+    Returns:
+        {str}
+    '''
+    nonterminals = {x[0] for x in grammar}
+    found = set()
+    changed = True
+    while changed:
+        changed = False
+        for left, right in grammar:
+            if left not in found and all(x in found or x not in nonterminals for x in right):
+                found.add(left)
+                changed = True
+    return found
+
+
+
+def reachable(grammar: [[str, [str]]], start: str) -> {str}:
+    '''Finds the nonterminals that can be reached from the start symbol
+
+    Args:
+        grammar ([[str, [str]]])
+        start (str)
+
+    Returns:
+        {str}
+    '''
+    nonterminals = {x[0] for x in grammar}
+    found = {start}
+    visited = [start]
+    for symbol in visited: # visited grows while it's iterated over
+        for left, right in grammar:
+            if left == symbol:
+                for x in right:
+                    if x in nonterminals and x not in found:
+                        found.add(x)
+                        visited.append(x)
+    return found
+
+
+
+def remove_useless(grammar: [[str, [str]]], origin: [[int]]) -> ([[str, [str]]], [[int]]):
+    '''Removes the rules of nonterminals that can't produce a string of terminals or can't be reached from the start symbol
+
+    Unproductive nonterminals go first, since removing their rules can make other nonterminals unreachable.
+
+    Args:
+        grammar ([[str, [str]]])
+        origin ([[int]]): see normalize()
+
+    Returns:
+        ([[str, [str]]], [[int]]): the updated grammar and origin
+    '''
+    start = grammar[0][0]
+    nonterminals = {x[0] for x in grammar}
+    useful = productive(grammar)
+    keep = [index for index, (left, right) in enumerate(grammar) if left in useful and all(x in useful or x not in nonterminals for x in right)]
+    grammar = [grammar[x] for x in keep]
+    origin = [origin[x] for x in keep]
+
+    useful = reachable(grammar, start)
+    keep = [index for index, (left, _) in enumerate(grammar) if left in useful]
+    return [grammar[x] for x in keep], [origin[x] for x in keep]
+
+
+
+def remove_units(grammar: [[str, [str]]], origin: [[int]]) -> ([[str, [str]]], [[int]]):
+    '''Replaces unit productions like <stat> --> <write> with the productions of the nonterminal on their right side
+
+    Example:
+        <stat> --> <write>
+        <write> --> write ( <identifier> ) ;
+        becomes
+        <stat> --> write ( <identifier> ) ;
+
+    A nonterminal B is only replaced if unit productions are the only place it's used, so B disappears from the CFG.
+    If B were still used somewhere else (ex: <letter> in <identifier> --> <identifier> <letter>) its productions would exist twice
+    and every node that shifts past one of them would be split in two, which makes the FA bigger instead of smaller.
+    It could also put A --> CURSOR x and B --> CURSOR x in the same node (ex: <expr> --> <term> where <term> --> <term> * <factor>),
+    which would give the table reduce/reduce conflicts.
+
+    Args:
+        grammar ([[str, [str]]])
+        origin ([[int]]): see normalize()
+
+    Returns:
+        ([[str, [str]]], [[int]]): the updated grammar and origin
+    '''
+    start = grammar[0][0]
+    nonterminals = {x[0] for x in grammar}
+    grammar = [[left, list(right)] for left, right in grammar]
+    origin = [list(x) for x in origin]
+
+    while True:
+        units = dict()      # {B: whether B is only used in unit productions}
+        has_units = set()   # nonterminals with a unit production
+        for left, right in grammar:
+            for symbol in right:
+                if symbol in nonterminals:
+                    unit = len(right) == 1 and symbol != left
+                    units[symbol] = units.get(symbol, True) and unit
+            if len(right) == 1 and right[0] in nonterminals:
+                has_units.add(left)
+
+        # replace the units of B first, so its productions can be copied as they are
+        targets = [x for x, only_units in units.items() if only_units and x != start and x not in has_units]
+        if not targets:
+            return grammar, origin
+
+        target = targets[0]
+        replacements = [(right, origin[index]) for index, (left, right) in enumerate(grammar) if left == target]
+        updated = list()
+        updated_origin = list()
+        for index, (left, right) in enumerate(grammar):
+            if left == target:
+                continue
+            if right == [target]:
+                updated += [[left, list(r)] for r, _ in replacements]
+                updated_origin += [origin[index] + o for _, o in replacements]
+            else:
+                updated.append([left, right])
+                updated_origin.append(origin[index])
+        grammar = updated
+        origin = updated_origin
+        nonterminals.discard(target)
+
+
+
+def merge_equivalent(grammar: [[str, [str]]], origin: [[int]]) -> ([[str, [str]]], [[int]]):
+    '''Removes duplicate rules and merges nonterminals that have exactly the same productions
+
+    Example:
+        <sign> --> +
+        <sign> --> -
+        <op> --> +
+        <op> --> -
+        every <op> is replaced with <sign> and the rules of <op> are removed
+
+    Args:
+        grammar ([[str, [str]]])
+        origin ([[int]]): see normalize()
+
+    Returns:
+        ([[str, [str]]], [[int]]): the updated grammar and origin
+    '''
+    start = grammar[0][0]
+    while True:
+        seen = set()
+        keep = list()
+        for index, (left, right) in enumerate(grammar):
+            if (left, tuple(right)) not in seen:
+                seen.add((left, tuple(right)))
+                keep.append(index)
+        grammar = [grammar[x] for x in keep]
+        origin = [origin[x] for x in keep]
+
+        productions = dict()
+        for left, right in grammar:
+            productions.setdefault(left, set()).add(tuple(right))
+        owners = dict()
+        renames = dict()
+        for name, rights in productions.items():
+            key = frozenset(rights)
+            if key in owners and name != start:
+                renames[name] = owners[key]
+            else:
+                owners.setdefault(key, name)
+        if not renames:
+            return grammar, origin
+
+        keep = [index for index, (left, _) in enumerate(grammar) if left not in renames]
+        grammar = [[grammar[x][0], [renames.get(y, y) for y in grammar[x][1]]] for x in keep]
+        origin = [origin[x] for x in keep]
+
+
+
+def normalize(grammar: [[str, [str]]]) -> ([[str, [str]]], [[int]]):
+    '''Shrinks a CFG without changing the language it describes, so its FA has fewer nodes and parsing it takes fewer reductions
+
+    1. removes nonterminals that can't produce a string of terminals or can't be reached
+    2. replaces unit productions. see remove_units()
+    3. merges duplicate rules and equivalent nonterminals
+
+    Precedence declarations are kept as they are.
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way. it is not changed
+
+    Returns:
+        ([[str, [str]]], [[int]]): the normalized CFG, and the original rule #s each of its rules stands for.
+            origin[x] is the rules of the original CFG that rule #x replaces, in the order they would have been expanded.
+            reducing by rule #x is the same as reducing by each of them in reverse order. origin[0] is [0], the START rule
+    '''
+    grammar, declarations = CFGtoLR.split_declarations(grammar)
+    origin = [[index] for index in range(1, len(grammar)+1)]
+    grammar, origin = remove_useless(grammar, origin)
+    grammar, origin = remove_units(grammar, origin)
+    grammar, origin = merge_equivalent(grammar, origin)
+    return grammar + declarations, [[0]] + origin
@@ -0,0 +1,167 @@
+# standard libraries
+import argparse
+import json
+
+# local modules
+import CFGtoLR
+
+
+
+TEMPLATE = """\
+'''LR parser for {source}
+
+Generated by parsergen.py. do not edit, run parsergen.py again instead.
+
+This module can be used anywhere a CFGtoLR.DenseTable can, and parse() is a driver specialized for these tables.
+'''
+GRAMMAR_HASH = {grammar_hash!r}
+MODE = {mode!r}
+
+terminals = {terminals!r}
+nonterminals = {nonterminals!r}
+terminal_ids = {{name: index for index, name in enumerate(terminals)}}
+nonterminal_ids = {{name: index for index, name in enumerate(nonterminals)}}
+unknown = {unknown!r}
+rules = {rules!r}
+rule_left = {rule_left!r}
+rule_length = {rule_length!r}
+
+# ACTION[state # * ACTION_WIDTH + terminal column #] and GOTO[state # * GOTO_WIDTH + nonterminal column #]. see CFGtoLR.DenseTable
+ACTION_WIDTH = {action_width!r}
+GOTO_WIDTH = {goto_width!r}
+ACTION = {action!r}
+GOTO = {goto!r}
+
+
+
+def action_at(state: int, column: int) -> int:
+    return ACTION[state*ACTION_WIDTH + column]
+
+
+
+def goto_at(state: int, column: int) -> int:
+    return GOTO[state*GOTO_WIDTH + column]
+
+
+
+def has_action(state: int, column: int) -> bool:
+    return ACTION[state*ACTION_WIDTH + column] != 0
+
+
+
+def has_goto(state: int, column: int) -> bool:
+    return GOTO[state*GOTO_WIDTH + column] != -1
+
+
+
+def expected(state: int) -> [str]:
+    row = state * ACTION_WIDTH
+    return [name for index, name in enumerate(terminals) if ACTION[row+index]]
+
+
+
+def parse(symbols: [int], on_reduce=None, on_error=None) -> (int, int):
+    '''Parses a list of terminal column #s that ends with the column of '$'
+
+    Args:
+        symbols ([int])
+        on_reduce (function): called with each rule # as it is reduced by, along with the values of the symbols on the rule's right side.
+            a terminal's value is its index in symbols, and the value of the rule's left side is whatever on_reduce returns.
+            without on_reduce, the left side takes the value of its first symbol
+        on_error (function): called with the index of a symbol that has no action, the stack of state #s and the values.
+            it can change the stack and values in place and return the index to keep parsing from, or None to stop
+
+    Returns:
+        (int, int): the index of the symbol that had no action (-1 if the input was accepted) and the state # it happened in
+    '''
+    action = ACTION
+    goto = GOTO
+    left = rule_left
+    length = rule_length
+    stack = [0]
+    values = []
+    index = 0
+    while True:
+        state = stack[-1]
+        value = action[state*ACTION_WIDTH + symbols[index]]
+        if value > 0:           # Sn
+            stack.append(value-1)
+            values.append(index)
+            index += 1
+        elif value < -1:        # Rn
+            rule = -value-1
+            size = length[rule]
+            if size:
+                children = values[-size:]
+                del stack[-size:]
+                del values[-size:]
+            else:
+                children = []
+            stack.append(goto[stack[-1]*GOTO_WIDTH + left[rule]])
+            if on_reduce:
+                values.append(on_reduce(rule, children))
+            else:
+                values.append(children[0] if children else index)
+        elif value:             # ACC
+            return -1, state
+        else:                   # empty cell
+            resume = on_error(index, stack, values) if on_error else None
+            if resume is None:
+                return index, state
+            index = resume
+"""
+
+
+
+def generate(grammar: [[str, [str]]], filename: str, mode: str = 'SLR', source: str = 'a CFG', workers: int = None):
+    '''Writes a standalone python module that holds the LR Parsing Table of a CFG as literal constants, along with a driver for it
+
+    Importing the module is all it takes to parse, so nothing has to be loaded or converted when a program starts.
+
+    Args:
+        grammar ([[str, [str]]]): the CFG formatted in a very specific way
+        filename (str): the .py file to write
+        mode (str): 'SLR' or 'LALR'. see CFGtoLR.LRParsingTable
+        source (str): where the CFG came from. only used in the module's docstring
+        workers (int): see CFGtoLR.build()
+    '''
+    LR = CFGtoLR.build(grammar, mode, workers)
+    rules = LR.CFG.rule_metadata()
+    table = CFGtoLR.DenseTable(LR.table, LR.CFG.terminals, rules)
+
+    action = tuple(value for row in table.action for value in row)
+    goto = tuple(value for row in table.goto for value in row)
+    contents = TEMPLATE.format(
+        source=source,
+        grammar_hash=CFGtoLR.grammar_hash(grammar, mode),
+        mode=mode,
+        terminals=table.terminals,
+        nonterminals=table.nonterminals,
+        unknown=table.unknown,
+        rules=rules,
+        rule_left=tuple(table.rule_left),
+        rule_length=tuple(table.rule_length),
+        action_width=len(table.terminals)+1,
+        goto_width=len(table.nonterminals),
+        action=action,
+        goto=goto
+    )
+
+    print(f'writing parser to {filename}...', end=' ')
+    with open(filename, 'w', encoding='utf8') as file:
+        file.write(contents)
+    print('ok')
+
+
+
+if __name__ in '__main__':
+    parser = argparse.ArgumentParser(description='generates a standalone LR parser module from a CFG')
+    parser.add_argument('grammar', nargs='?', default='CFG.json', help='the CFG file (default: CFG.json)')
+    parser.add_argument('output', nargs='?', default='lr_parser.py', help='the module to write (default: lr_parser.py)')
+    parser.add_argument('--mode', choices=CFGtoLR.MODES, default='SLR')
+    parser.add_argument('--workers', type=int, help='generate the FA with this many processes (default: 1)')
+    args = parser.parse_args()
+
+    with open(args.grammar, 'r') as file:
+        CFG = json.load(file)
+    generate(CFG, args.output, args.mode, args.grammar, args.workers)
@@ -0,0 +1,154 @@
+class Name:
+    __slots__ = ('name', 'index')
+
+    def __init__(self, name: str, index: int):
+        '''A variable name
+
+        Args:
+            name (str)
+            index (int): the index of the word it came from
+        '''
+        self.name = name
+        self.index = index
+
+
+
+    def python(self) -> str:
+        return self.name
+
+
+
+
+
+class Number:
+    __slots__ = ('value',)
+
+    def __init__(self, value: str):
+        '''An integer constant
+
+        Args:
+            value (str): the digits, along with the sign if there is one. ex: -12
+        '''
+        self.value = value
+
+
+
+    def python(self) -> str:
+        return self.value
+
+
+
+
+
+class BinaryOp:
+    __slots__ = ('operator', 'left', 'right')
+
+    # how tightly each operator binds. higher binds tighter
+    PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+
+    def __init__(self, operator: str, left, right):
+        '''An arithmetic expression like a1b * ( b + 2 )
+
+        Args:
+            operator (str): +, -, * or /
+            left (BinaryOp or Name or Number)
+            right (BinaryOp or Name or Number)
+        '''
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+
+
+    def python(self) -> str:
+        '''Generates the expression, only adding parentheses where python would otherwise group it differently
+
+        Every operator is left associative, so a right side with the same precedence needs parentheses. ex: a - ( b - c )
+        '''
+        precedence = self.PRECEDENCE[self.operator]
+        left = self.left.python()
+        right = self.right.python()
+        if isinstance(self.left, BinaryOp) and self.PRECEDENCE[self.left.operator] < precedence:
+            left = f'({left})'
+        if isinstance(self.right, BinaryOp) and self.PRECEDENCE[self.right.operator] <= precedence:
+            right = f'({right})'
+        return f'{left} {self.operator} {right}'
+
+
+
+
+
+class Assign:
+    __slots__ = ('target', 'value')
+
+    def __init__(self, target: Name, value):
+        '''A statement like w = a1b * 2 ;
+
+        Args:
+            target (Name)
+            value (BinaryOp or Name or Number)
+        '''
+        self.target = target
+        self.value = value
+
+
+
+    def python(self) -> str:
+        return f'{self.target.python()} = {self.value.python()}'
+
+
+
+
+
+class Write:
+    __slots__ = ('label', 'value')
+
+    def __init__(self, label: str, value: Name):
+        '''A statement like write ( "value=" , w ) ;
+
+        Args:
+            label (str): the string printed before the value, including its quotes. None if there isn't one
+            value (Name)
+        '''
+        self.label = label
+        self.value = value
+
+
+
+    def python(self) -> str:
+        if self.label:
+            return f'print({self.label}, {self.value.python()})'
+        return f'print({self.value.python()})'
+
+
+
+
+
+class Program:
+    __slots__ = ('name', 'variables', 'statements')
+
+    def __init__(self, name: Name, variables: [Name], statements: list):
+        '''The root of the syntax tree
+
+        Args:
+            name (Name): the name after program
+            variables ([Name]): every variable declared in var, in the order they were declared
+            statements ([Assign or Write]): the statements between begin and end. in order
+        '''
+        self.name = name
+        self.variables = variables
+        self.statements = statements
+
+
+
+    def python(self) -> str:
+        '''Generates the python code of the whole program
+        '''
+        output_string = '# declare variables\n# although not necessary for python, i thought it would be nice to mimic the input\n'
+        for var in self.variables:
+            output_string += f'{var.python()} = int()\n'
+
+        output_string += '\n# logic\n'
+        for statement in self.statements:
+            output_string += statement.python() + '\n'
+        return output_string
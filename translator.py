@@ -1,5 +1,58 @@
-def get_words(contents: str) -> [str]:
-    '''Splits up a string into alphanumeric words and special characters
+# global variables
+TOKEN_KINDS = ('IDENT', 'NUMBER', '$')  # kinds that only tokenize() and translate() can give a word, never its text
+
+
+
+class Token(str):
+    def __new__(cls, text: str, kind: str = None, line: int = None, column: int = None):
+        '''A word of the source code that also knows which terminal it is and where it was written
+
+        Since it's a str, a Token can be used anywhere a word can.
+
+        Example:
+            token = Token('a1b', 'IDENT')
+            print(token, token.kind)
+            > a1b IDENT
+
+        Args:
+            text (str): the word
+            kind (str): 'IDENT', 'NUMBER' or for keywords and symbols, the word itself. '' for a word that isn't a terminal
+            line (int): the line # it starts on, starting from 1
+            column (int): the column # it starts at, starting from 1
+
+        Attributes:
+            kind (str): see args
+            line (int): see args
+            column (int): see args
+        '''
+        token = super().__new__(cls, text)
+        token.kind = text if kind is None else kind
+        token.line = line
+        token.column = column
+        return token
+
+
+
+
+
+def combine(text: str, first: str) -> Token:
+    '''Makes a Token that replaces several words, at the position of the first one
+
+    Args:
+        text (str): the new word
+        first (str): the first of the words it replaces. if it's a Token, its line and column are kept
+
+    Returns:
+        Token
+    '''
+    return Token(text, line=getattr(first, 'line', None), column=getattr(first, 'column', None))
+
+
+
+
+
+def get_words(contents: str) -> [Token]:
+    '''Splits up a string into alphanumeric words and special characters, keeping track of where each one was
 
     Example:
         input_string = 'lorem ipsum;dolor 100 sit*amet200'
@@ -11,19 +64,32 @@ def get_words(contents: str) -> [str]:
         contents (str): the string to split up
 
     Returns:
-        [str]: a list of every word in the contents
+        [Token]: a list of every word in the contents
     '''
     words = []
     word = ''
+    line = 1
+    column = 1
+    start = 1
     for char in contents:
         if char.isalnum():
+            if not word:
+                start = column
             word += char
-            continue
-        if word:
-            words.append(word)
-        if char != ' ' and char != '\t':
-            words.append(char)
-        word = ''
+        else:
+            if word:
+                words.append(Token(word, line=line, column=start))
+            if char != ' ' and char != '\t':
+                words.append(Token(char, line=line, column=column))
+            word = ''
+
+        if char == '\n':
+            line += 1
+            column = 1
+        else:
+            column += 1
+    if word:
+        words.append(Token(word, line=line, column=start))
     return words
 
 
@@ -52,7 +118,7 @@ def char_combiner(char: str, list_: list, ) -> [str]:
                 return_me.append(list_[index])
             break
         if list_[index] == '*' and list_[index+1] == '*':
-            return_me.append('**')
+            return_me.append(combine('**', list_[index]))
             skip = True
         elif skip:
             skip = False
@@ -66,7 +132,9 @@ def char_combiner(char: str, list_: list, ) -> [str]:
 def comment_remover(words_list: list) -> [str]:
     '''Removes comments from the words list
 
-    Removes every list element between two '**' as well as the '**' themselves
+    Removes every list element between two '**' as well as the '**' themselves.
+    If there is no ending '**', then everything after the last '**' is a comment.
+    The list is only read once, so this takes linear time however many comments there are.
 
     Args:
         words_list ([str]): the words list to remove comments from
@@ -74,12 +142,14 @@ def comment_remover(words_list: list) -> [str]:
     Returns:
         [str]: the updated list
     '''
-    while '**' in words_list:
-        if len([x for x in words_list if x == '**']) > 1: # makes sure there's an ending '**' for the comment
-            del words_list[words_list.index('**'):words_list.index('**', words_list.index('**')+1)+1]
-        else:
-            del words_list[words_list.index('**'):] # if there is no ending '**', then assume everything after the first '**' is a comment
-    return words_list
+    return_me = []
+    in_comment = False
+    for word in words_list:
+        if word == '**':
+            in_comment = not in_comment
+        elif not in_comment:
+            return_me.append(word)
+    return return_me
 
 
 
@@ -106,56 +176,93 @@ def rm_cons_dupes(char: str, words_list: list) -> [str]:
 def special_case_fixer(words_list: list) -> [str]:
     '''There are two entries in particular that need to fixed.
 
-    "value=" gets expanded into [\u201c, value, =, \u201d]
+    "value=" gets expanded into [\u201c, value, =, \u201d] or [", value, =, "]
     end. gets expanded into [end, .]
 
+    The list is only read once, so this takes linear time however many of them there are.
+
     Args:
         words_list ([str])
 
     Returns:
         [str]
     '''
-    if '\u201c' in words_list:
-        # fix "value="
-        index = words_list.index('\u201c')
-        if words_list[index:index+4] == ['\u201c', 'value', '=', '\u201d']:
-            words_list = words_list[:index] + words_list[index+4:]
-            words_list.insert(index, '"value="')
+    quotes = {'"': '"', '\u201c': '\u201d'} # opening quote: closing quote
+    return_me = []
+    index = 0
+    while index < len(words_list):
+        word = words_list[index]
+        if word in quotes and words_list[index+1:index+4] == ['value', '=', quotes[word]]:
+            # fix "value="
+            return_me.append(combine('"value="', word))
+            index += 4
+        elif word == 'end' and words_list[index+1:index+2] == ['.']:
+            # fix end.
+            return_me.append(combine('end.', word))
+            index += 2
+        else:
+            return_me.append(word)
+            index += 1
+    return return_me
+
+
 
-    if '"' in words_list:
-        # fix "value="
-        while '"' in words_list:
-            index = words_list.index('"')
-            if words_list[index:index+4] == ['"', 'value', '=', '"']:
-                words_list = words_list[:index] + words_list[index+4:]
-                words_list.insert(index, '"value="')
 
-    if 'end' in words_list:
-        # fix end.
-        index = words_list.index('end')
-        if words_list[index+1] == '.':
-            words_list = words_list[:index] + words_list[index+2:]
-            words_list.insert(index, 'end.')
+def tokenize(words_list: list, keywords: [str]) -> [Token]:
+    '''Gives each word its kind of terminal, so the parser can read a variable name or a number as one symbol
 
-    return words_list
+    A word is classified by its text first, so a word spelled like one of TOKEN_KINDS can't pass itself off as that kind.
+    Keywords still win over IDENT, since they're spelled like names.
 
+    Example:
+        input_list = ['w', '=', 'a1b', '*', '25', ';']
+        output_list = tokenize(input_list, ['=', '*', ';'])
+        print([x.kind for x in output_list])
+        > ['IDENT', '=', 'IDENT', '*', 'NUMBER', ';']
+
+    Args:
+        words_list ([str])
+        keywords ([str]): the words that are terminals of the CFG by themselves. see CFGtoLR.terminals(). TOKEN_KINDS are left out
+
+    Returns:
+        [Token]
+    '''
+    keywords = set(keywords).difference(TOKEN_KINDS)
+    tokens = []
+    for word in words_list:
+        if word.isdigit():
+            kind = 'NUMBER'
+        elif word in keywords:
+            kind = word
+        elif word.isalnum() and word[0].isalpha():
+            kind = 'IDENT'
+        else:
+            kind = ''
+        if isinstance(word, Token): # the words of translate() are already Tokens, so they only need their kind
+            word.kind = kind
+            tokens.append(word)
+        else:
+            tokens.append(Token(word, kind))
+    return tokens
 
 
 
-def translate(input_file: str, output_file: str) -> [str]:
+def translate(input_file: str, output_file: str, keywords: [str]) -> [Token]:
     '''Translates the contents of a file into a list of words that the compiler can better understand
 
     1. separates the text into words
     2. removes white space
     3. removes comments
     4. removes empty lines
+    5. turns the words into tokens
 
     Args:
         input_file (str): the filename of the file to read from
         output_file (str): the filename of the file to write to
+        keywords ([str]): see tokenize()
 
     Returns:
-        [str]: a list of words translated from the input file
+        [Token]: a list of words translated from the input file
     '''
     print(f'reading {input_file}...', end=' ')
     with open(input_file, 'r', encoding='utf8') as file:
@@ -175,50 +282,6 @@ def translate(input_file: str, output_file: str) -> [str]:
         file.write('\n'.join(' '.join(words).split(' \n ')))
     print('ok')
 
-    return [w for w in words if w != '\n'] + ['$']
-
-
-
-def translate_lines(input_file: str) -> {int: [str]}:
-    '''Translates the contents of a file into a list of words split by lines
-
-    Used only for outputing more precise error messages
-
-    Args:
-        input_file (str)
-
-    Returns:
-        {int: [str]}: keys are line numbers, values are lists whose elements are the words for that line
-    '''
-    with open(input_file, 'r', encoding='utf8') as file:
-        lines = [x for x in file]
-
-    fixed_lines = dict()
-    for index in range(len(lines)):
-            contents = lines[index]
-            words = get_words(contents)
-            words = char_combiner('*', words)
-            fixed_lines[index] = [w for w in words if w != '\n']
-
-    # remove multi-line comments
-    multi_line = False
-    for key in fixed_lines:
-        line = fixed_lines[key]
-        if multi_line:
-            if '**' in line:
-                fixed_lines[key] = fixed_lines[key][line.index('**')+1:]
-                multi_line = False
-            else:
-                fixed_lines[key] = []
-
-        line = fixed_lines[key]
-        if len([x for x in line if x == '**']) % 2 == 1: # if there's an odd frequency of '**', then there's a multi-line comment
-            multi_line = True
-            last_pos = len(line) - line[::-1].index('**') - 1 # last position of '**'
-            fixed_lines[key] = fixed_lines[key][:last_pos]
-
-    for key in fixed_lines:
-        fixed_lines[key] = comment_remover(fixed_lines[key])
-        fixed_lines[key] = special_case_fixer(fixed_lines[key])
-
-    return fixed_lines
\ No newline at end of file
+    words = [w for w in words if w != '\n']
+    end = Token('$', line=words[-1].line, column=words[-1].column+len(words[-1])) if words else Token('$', line=1, column=1)
+    return tokenize(words, keywords) + [end]